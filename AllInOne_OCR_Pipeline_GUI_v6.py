@@ -2,11 +2,27 @@
 import os
 import shutil
 import re
+import stat
+import time
+import errno
+import numbers
+import queue
 import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
+from operator import itemgetter
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-import pandas as pd
+# pandas is imported inside the functions that use it: it costs a second or
+# more at startup, and the window (and pre-OCR runs without a report) don't
+# need it.
+
+# python-calamine (Rust reader) when installed, otherwise pandas picks its default
+# (openpyxl for .xlsx, xlrd for .xls). find_spec only looks the package up, no import.
+READ_ENGINE = "calamine" if find_spec("python_calamine") else None
 
 # =========================================================
 # Shared helpers
@@ -15,10 +31,27 @@ import pandas as pd
 def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
+# Folders already created/confirmed during the current run (see ensure_dir_once)
+_known_dirs: set[str] = set()
+
+def ensure_dir_once(path: str):
+    """
+    ensure_dir for per-file loops: many files land in the same folder, so
+    only the first call per folder hits the filesystem. Entry points clear
+    the cache at the start of each run.
+    """
+    if path in _known_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    _known_dirs.add(path)
+
+# Mapping sheets repeat the same folder for many rows, so path helpers are memoized
+@lru_cache(maxsize=65536)
 def normalize_path(p: str) -> str:
     # Windows-friendly, tolerant of /
     return str(p).strip().replace("/", "\\")
 
+@lru_cache(maxsize=65536)
 def strip_drive_and_leading_slashes(p: str) -> str:
     """
     Turn full paths into relative-ish paths by stripping:
@@ -43,6 +76,80 @@ def parse_extensions(ext_text: str) -> tuple[str, ...]:
     # unique, preserve order
     return tuple(dict.fromkeys(exts))
 
+def _ext_matcher(exts: tuple[str, ...]):
+    """
+    Build a test for "lowercased filename ends with one of exts".
+
+    Short lists keep str.endswith(tuple); longer ones look up the text after
+    the last dot in a frozenset (one hash instead of k comparisons per file).
+    Multi-dot extensions (".tar.gz") can't be split that way -> endswith.
+    """
+    if len(exts) <= 3 or any(e.count(".") != 1 or not e.startswith(".") for e in exts):
+        return lambda name_lower: name_lower.endswith(exts)
+
+    ext_set = frozenset(exts)
+
+    def check(name_lower: str) -> bool:
+        i = name_lower.rfind(".")
+        return i >= 0 and name_lower[i:] in ext_set
+
+    return check
+
+def _list_files_win(folder: str):
+    """
+    Windows only: [(name, full_path), ...] for the non-folder entries of folder,
+    listed with FindFirstFileExW(FindExInfoBasic, FIND_FIRST_EX_LARGE_FETCH):
+    no 8.3 short-name lookup and bigger fetches per kernel call than the
+    plain FindFirstFileW behind os.scandir - noticeably faster on huge flat
+    folders, especially over SMB.
+
+    Returns None if the API can't be used or the listing fails (callers fall
+    back to os.scandir, which then raises the usual error).
+    """
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        find_first = kernel32.FindFirstFileExW
+        find_first.argtypes = [wintypes.LPCWSTR, ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD]
+        find_first.restype = wintypes.HANDLE
+        find_next = kernel32.FindNextFileW
+        find_next.argtypes = [wintypes.HANDLE, ctypes.c_void_p]
+        find_next.restype = wintypes.BOOL
+        find_close = kernel32.FindClose
+        find_close.argtypes = [wintypes.HANDLE]
+    except (ImportError, AttributeError, OSError):
+        return None
+
+    FIND_EX_INFO_BASIC = 1
+    FIND_EX_SEARCH_NAME_MATCH = 0
+    FIND_FIRST_EX_LARGE_FETCH = 2
+    FILE_ATTRIBUTE_DIRECTORY = 0x10
+    ERROR_NO_MORE_FILES = 18
+
+    data = wintypes.WIN32_FIND_DATAW()
+    handle = find_first(
+        os.path.join(folder, "*"), FIND_EX_INFO_BASIC, ctypes.byref(data),
+        FIND_EX_SEARCH_NAME_MATCH, None, FIND_FIRST_EX_LARGE_FETCH,
+    )
+    if handle is None or handle == wintypes.HANDLE(-1).value:
+        return None
+
+    files = []
+    try:
+        while True:
+            if not data.dwFileAttributes & FILE_ATTRIBUTE_DIRECTORY:
+                name = data.cFileName
+                files.append((name, os.path.join(folder, name)))
+            if not find_next(handle, ctypes.byref(data)):
+                if ctypes.get_last_error() != ERROR_NO_MORE_FILES:
+                    return None
+                break
+    finally:
+        find_close(handle)
+    return files
+
 def build_flat_index(flat_folder: str, allowed_exts: tuple[str, ...] | None = None):
     """
     Index files in a (typically flat) folder.
@@ -51,77 +158,478 @@ def build_flat_index(flat_folder: str, allowed_exts: tuple[str, ...] | None = No
         unique_lookup: filename_lower -> full path (only for unique filenames)
         duplicates: dict filename_lower -> list of full paths (for duplicates)
         all_files: dict filename_lower -> list of full paths (for reference)
+        dup_file_count: number of files across all duplicate names
     """
     all_files: dict[str, list[str]] = {}
-    for name in os.listdir(flat_folder):
-        full = os.path.join(flat_folder, name)
-        if os.path.isfile(full):
-            if allowed_exts is not None:
-                if not name.lower().endswith(allowed_exts):
-                    continue
+    ext_ok = _ext_matcher(allowed_exts) if allowed_exts is not None else None
+
+    listing = _list_files_win(flat_folder) if os.name == "nt" else None
+    if listing is not None:
+        for name, path in listing:
             key = name.lower()
-            all_files.setdefault(key, []).append(full)
+            if ext_ok is not None:
+                if not ext_ok(key):
+                    continue
+            all_files.setdefault(key, []).append(path)
+    else:
+        with os.scandir(flat_folder) as it:
+            for entry in it:
+                # Filter on the name first: is_file() is usually answered from the
+                # directory listing, but needs a stat on filesystems without d_type
+                key = entry.name.lower()
+                if ext_ok is not None:
+                    if not ext_ok(key):
+                        continue
+                if entry.is_file():
+                    all_files.setdefault(key, []).append(entry.path)
 
     unique_lookup: dict[str, str] = {}
     duplicates: dict[str, list[str]] = {}
+    dup_file_count = 0
 
     for key, paths in all_files.items():
         if len(paths) == 1:
             unique_lookup[key] = paths[0]
         else:
             duplicates[key] = paths
+            dup_file_count += len(paths)
 
-    return unique_lookup, duplicates, all_files
+    return unique_lookup, duplicates, all_files, dup_file_count
 
-def write_report_one_workbook(report_path: str, summary_row, missing_rows, duplicate_rows, orphan_rows):
+def walk_files(top: str):
     """
-    ONE workbook with multiple sheets (Summary/Missing/Duplicates/Orphans).
+    os.walk replacement built on os.scandir.
+
+    Yields (dirpath, file_entries) top-down in the same order as os.walk.
+    The DirEntry objects keep the type/stat info from the directory listing,
+    so callers can use entry.stat().st_size without another full stat
+    (free on Windows, where FindNextFile already returns the size).
+    Like os.walk: unreadable folders are skipped and symlinked folders are
+    not descended into.
     """
-    if not report_path:
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    else:
+                        files.append(entry)
+        except OSError:
+            continue
+        yield dirpath, files
+        stack.extend(reversed(subdirs))
+
+def _kernel_copy(src: str, dst: str):
+    """
+    Copy file data inside the kernel: copy_file_range (Linux 4.5+), falling
+    back to sendfile when the filesystem pair doesn't support it.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        _kernel_copy_fds(fsrc.fileno(), fdst.fileno())
+
+def _kernel_copy_fds(in_fd: int, out_fd: int):
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while True:
+                n = os.copy_file_range(in_fd, out_fd, 1 << 30)
+                if n == 0:
+                    return
+                copied += n
+        except OSError as e:
+            if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    while True:
+        n = os.sendfile(out_fd, in_fd, None, 1 << 30)
+        if n == 0:
+            return
+
+def fast_copy(src: str, dst: str, st: os.stat_result | None = None):
+    """
+    shutil.copy2 replacement using the platform copy primitive:
+      - Windows: CopyFileExW (copies timestamps/attributes itself)
+      - POSIX:   copy_file_range/sendfile, then restore mode + atime/mtime
+    Pass st (e.g. a cached DirEntry.stat()) to skip re-stat'ing the source.
+    Falls back to shutil.copy2 whenever the fast path isn't available.
+    """
+    if os.name == "nt":
+        try:
+            import ctypes
+            if ctypes.windll.kernel32.CopyFileExW(src, dst, None, None, None, 0):
+                return
+        except Exception:
+            pass
+        shutil.copy2(src, dst)
         return
 
+    try:
+        if st is None:
+            st = os.stat(src)
+        _kernel_copy(src, dst)
+        os.chmod(dst, stat.S_IMODE(st.st_mode))
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+# POSIX: rename/open relative to an open folder fd instead of re-resolving
+# full paths on every call
+_RENAME_DIR_FD = os.rename in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+_COPY_DIR_FD = (
+    os.open in os.supports_dir_fd and os.utime in os.supports_fd
+    and hasattr(os, "O_DIRECTORY") and hasattr(os, "sendfile")
+)
+
+def _copy_at(src_dir_fd: int, src_name: str, dst_dir_fd: int, dst_name: str, st: os.stat_result):
+    """
+    fast_copy between two open folder fds (POSIX): both files are opened
+    relative to their folder (openat), then mode + atime/mtime are set on
+    the open destination fd.
+    """
+    in_fd = os.open(src_name, os.O_RDONLY, dir_fd=src_dir_fd)
+    try:
+        out_fd = os.open(dst_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666, dir_fd=dst_dir_fd)
+        try:
+            _kernel_copy_fds(in_fd, out_fd)
+            os.fchmod(out_fd, stat.S_IMODE(st.st_mode))
+            os.utime(out_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+class _DirFdPool:
+    """
+    Folder fds shared by rename/copy workers (POSIX only).
+
+    pending maps folder -> number of files still to handle in it; a folder is
+    opened on first use and closed after its last file, so only the folders
+    currently being worked on hold a descriptor.
+    """
+
+    def __init__(self, pending: dict[str, int]):
+        self.pending = pending
+        self.fds: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, dirpath: str) -> int:
+        with self.lock:
+            fd = self.fds.get(dirpath)
+            if fd is None:
+                fd = self.fds[dirpath] = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY)
+            return fd
+
+    def release(self, dirpath: str):
+        with self.lock:
+            self.pending[dirpath] -= 1
+            if self.pending[dirpath] == 0:
+                fd = self.fds.pop(dirpath, None)
+                if fd is not None:
+                    os.close(fd)
+
+class _LogBuffer:
+    """
+    Batches per-file log lines: log_fn gets one multi-line message per
+    flush_every lines (or every flush_interval seconds, so the GUI still
+    shows progress) instead of one call per file.
+
+    success() lines are dropped entirely when verbose is False; warnings and
+    errors always go through append().
+    """
+
+    def __init__(self, log_fn, verbose: bool = True, flush_every: int = 1024, flush_interval: float = 0.5):
+        self.log_fn = log_fn
+        self.verbose = verbose
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.lines: list[str] = []
+        self._last_flush = time.monotonic()
+
+    def append(self, msg: str):
+        self.lines.append(msg)
+        if len(self.lines) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def success(self, msg: str):
+        if self.verbose:
+            self.append(msg)
+
+    def flush(self):
+        if self.lines:
+            self.log_fn("\n".join(self.lines))
+            self.lines = []
+        self._last_flush = time.monotonic()
+
+MISSING_COLUMNS = ["row_index", "source", "target_folder_rel", "expected_output_name", "reason"]
+DUPLICATE_COLUMNS = ["flat_filename", "duplicate_count", "flat_full_path"]
+ORPHAN_COLUMNS = ["flat_filename", "flat_full_path"]
+EXCEL_MAX_ROWS = 1_048_576  # per sheet, header included
+
+RENAME_COLUMNS = ["source_full_path", "new_full_path", "original_name", "new_name", "token", "action", "status", "reason"]
+FLAT_RENAME_COLUMNS = ["old_full_path", "new_full_path", "status", "reason"]
+
+class ReportTable:
+    """
+    Rows for one report sheet, stored column-wise (one list per column)
+    instead of one dict per row - much smaller for 100k+ row runs.
+    Missing values default to "".
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.data: dict[str, list] = {c: [] for c in self.columns}
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ReportTable":
+        table = cls(row)
+        table.append(**row)
+        return table
+
+    def append(self, **values):
+        for c, col in self.data.items():
+            col.append(values.get(c, ""))
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def rows(self):
+        return zip(*self.data.values())
+
+def _xlsxwriter():
+    """
+    The xlsxwriter module, or None when it isn't installed.
+    """
+    try:
+        import xlsxwriter
+        return xlsxwriter
+    except ImportError:
+        return None
+
+def _write_cell(ws, row, c, v):
+    """
+    Typed xlsxwriter write for one cell, picked from the value itself (a
+    column may mix numbers and text). Skips the generic write() dispatch,
+    so text that looks like a URL or formula stays plain text.
+    """
+    if isinstance(v, bool):
+        ws.write_boolean(row, c, v)
+    elif isinstance(v, numbers.Number):
+        ws.write_number(row, c, v)
+    else:
+        ws.write_string(row, c, str(v))
+
+def _write_sheet_rows(ws, table: ReportTable):
+    """
+    Header + one row per record, strictly in row order (required by constant_memory).
+    Empty cells are skipped entirely. Only for the one-row Summary sheet; detail
+    tables go through _StreamingSheet, which rolls over at Excel's row limit.
+    """
+    ws.write_row(0, 0, table.columns)
+    for i, values in enumerate(table.rows(), 1):
+        for j, v in enumerate(values):
+            if v is None or v == "":
+                continue
+            _write_cell(ws, i, j, v)
+
+def _emit_table(path: str, table: ReportTable):
+    """
+    Write one table to a standalone file; format picked from the extension
+    (only .csv for now - other flat formats slot in here).
+    """
+    import pandas as pd
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        df = pd.DataFrame(table.data, columns=table.columns, copy=False)
+        # utf-8-sig so Excel opens non-ASCII paths correctly
+        df.to_csv(path, index=False, lineterminator="\n", encoding="utf-8-sig")
+    else:
+        raise ValueError(f"Unsupported report table format: {ext}")
+
+def _write_csv_tables(report_path: str, sheets) -> str:
+    """
+    CSV flavour of a report: one {base}_{sheet}.csv per sheet next to report_path.
+    """
     out_dir = os.path.dirname(report_path)
     if out_dir:
         ensure_dir(out_dir)
+    base = os.path.splitext(report_path)[0]
+    for sheet_name, table in sheets:
+        _emit_table(f"{base}_{sheet_name.lower()}.csv", table)
+    return f"{base}_*.csv"
 
-    df_summary = pd.DataFrame([summary_row])
+def _write_workbook(report_path: str, sheets):
+    """
+    Write [(sheet_name, ReportTable), ...] into ONE workbook.
 
-    df_missing = pd.DataFrame(missing_rows) if missing_rows else pd.DataFrame(
-        columns=["row_index", "source", "target_folder_rel", "expected_output_name", "reason"]
-    )
+    Uses xlsxwriter directly (no DataFrame / ExcelFormatter layer) in
+    constant_memory mode; falls back to pandas + openpyxl if xlsxwriter
+    isn't installed.
+    """
+    out_dir = os.path.dirname(report_path)
+    if out_dir:
+        ensure_dir(out_dir)
 
-    df_dupes = pd.DataFrame(duplicate_rows) if duplicate_rows else pd.DataFrame(
-        columns=["flat_filename", "duplicate_count", "flat_full_path"]
-    )
+    xlsxwriter = _xlsxwriter()
+    if xlsxwriter is None:
+        import pandas as pd
 
-    df_orphans = pd.DataFrame(orphan_rows) if orphan_rows else pd.DataFrame(
-        columns=["flat_filename", "flat_full_path"]
-    )
+        with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
+            for sheet_name, table in sheets:
+                df = pd.DataFrame(table.data, columns=table.columns, copy=False)
+                df.to_excel(writer, index=False, sheet_name=sheet_name)
+        return
+
+    wb = xlsxwriter.Workbook(report_path, {"constant_memory": True, "strings_to_numbers": False})
+    try:
+        for sheet_name, table in sheets:
+            # written like a streamed sheet so a table past Excel's row limit rolls over
+            # onto "<name> (2)"... instead of being cut off
+            sheet = _StreamingSheet(wb, sheet_name, table.columns)
+            for values in table.rows():
+                sheet.append_row(values)
+    finally:
+        wb.close()
+
+class _StreamingSheet:
+    """
+    One worksheet written row-by-row as rows arrive. Same append()/len() as
+    ReportTable, so the rebuild loops don't care which one they're filling.
+    xlsxwriter drops rows past Excel's limit without raising, so a full sheet
+    continues on "<name> (2)", "<name> (3)"... each with its own header.
+    """
+
+    def __init__(self, wb, name, columns):
+        self.wb = wb
+        self.name = name
+        self.columns = list(columns)
+        self.count = 0
+        self.parts = 0
+        self._next_part()
+
+    def _next_part(self):
+        self.parts += 1
+        self.ws = self.wb.add_worksheet(self.name if self.parts == 1 else f"{self.name} ({self.parts})")
+        self.ws.write_row(0, 0, self.columns)
+        self.row = 0
+
+    def append(self, **values):
+        self.append_row([values.get(c) for c in self.columns])
+
+    def append_row(self, values):
+        """One row as a sequence in column order."""
+        if self.row == EXCEL_MAX_ROWS - 1:
+            self._next_part()
+        self.row += 1
+        self.count += 1
+        for j, v in enumerate(values):
+            if v is None or v == "":
+                continue
+            _write_cell(self.ws, self.row, j, v)
 
-    with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
-        df_summary.to_excel(writer, index=False, sheet_name="Summary")
-        df_missing.to_excel(writer, index=False, sheet_name="Missing")
-        df_dupes.to_excel(writer, index=False, sheet_name="Duplicates")
-        df_orphans.to_excel(writer, index=False, sheet_name="Orphans")
+    def __len__(self):
+        return self.count
 
-def write_rename_report(report_path: str, summary_row: dict, rows: list[dict]):
+class StreamingReport:
     """
-    ONE workbook for rename/copy step: Summary + Renames
+    Report workbook opened up front (xlsxwriter constant_memory): detail
+    rows (Missing/Duplicates/Orphans, or Renames) go straight to disk as
+    they're found instead of being held in memory. Summary is written on close();
+    callers abort() it in a finally so a run that fails part way still closes the file.
+    """
+
+    def __init__(self, report_path: str, sheets):
+        xlsxwriter = _xlsxwriter()
+        if xlsxwriter is None:
+            raise ImportError("Streaming reports need the xlsxwriter package.")
+        out_dir = os.path.dirname(report_path)
+        if out_dir:
+            ensure_dir(out_dir)
+        self.wb = xlsxwriter.Workbook(report_path, {"constant_memory": True, "strings_to_numbers": False})
+        self.summary_ws = self.wb.add_worksheet("Summary")
+        self.sheets = {name: _StreamingSheet(self.wb, name, columns) for name, columns in sheets}
+        self.closed = False
+
+    def close(self, summary_row: dict):
+        _write_sheet_rows(self.summary_ws, ReportTable.from_row(summary_row))
+        self.closed = True
+        self.wb.close()
+
+    def abort(self):
+        """Close without a summary, keeping the detail rows written so far."""
+        if not self.closed:
+            self.closed = True
+            self.wb.close()
+
+REBUILD_SHEETS = [("Missing", MISSING_COLUMNS), ("Duplicates", DUPLICATE_COLUMNS), ("Orphans", ORPHAN_COLUMNS)]
+
+def open_rebuild_report(report_path: str, stream_reports: bool, report_format: str = "xlsx"):
+    """
+    -> (stream, missing_rows, duplicate_rows, orphan_rows)
+
+    stream is a StreamingReport when streaming an xlsx report was asked for
+    (and xlsxwriter is available), else None and the rows are collected in ReportTables for
+    write_report_one_workbook at the end.
+    """
+    if report_path and stream_reports and report_format == "xlsx" and _xlsxwriter() is not None:
+        stream = StreamingReport(report_path, REBUILD_SHEETS)
+        return stream, stream.sheets["Missing"], stream.sheets["Duplicates"], stream.sheets["Orphans"]
+    return None, ReportTable(MISSING_COLUMNS), ReportTable(DUPLICATE_COLUMNS), ReportTable(ORPHAN_COLUMNS)
+
+def open_rename_report(report_path: str, stream_reports: bool, report_format: str = "xlsx"):
+    """
+    -> (stream, rows) for the pre-OCR Renames sheet; see open_rebuild_report.
+    """
+    if report_path and stream_reports and report_format == "xlsx" and _xlsxwriter() is not None:
+        stream = StreamingReport(report_path, [("Renames", RENAME_COLUMNS)])
+        return stream, stream.sheets["Renames"]
+    return None, ReportTable(RENAME_COLUMNS)
+
+def _write_report(report_path: str, sheets, report_format: str = "xlsx") -> str:
+    """
+    report_format "xlsx" -> one workbook; "csv" -> one CSV per sheet.
+    Returns what was written (for the log).
+    """
+    if report_format == "csv":
+        return _write_csv_tables(report_path, sheets)
+    _write_workbook(report_path, sheets)
+    return report_path
+
+def write_report_one_workbook(report_path: str, summary_row: dict, missing_rows, duplicate_rows, orphan_rows,
+                              report_format: str = "xlsx"):
+    """
+    ONE workbook with multiple sheets (Summary/Missing/Duplicates/Orphans).
     """
     if not report_path:
-        return
-    out_dir = os.path.dirname(report_path)
-    if out_dir:
-        ensure_dir(out_dir)
+        return ""
 
-    df_summary = pd.DataFrame([summary_row])
-    df_rows = pd.DataFrame(rows) if rows else pd.DataFrame(
-        columns=["source_full_path", "new_full_path", "original_name", "new_name", "token", "action", "status", "reason"]
-    )
+    return _write_report(report_path, [
+        ("Summary", ReportTable.from_row(summary_row)),
+        ("Missing", missing_rows),
+        ("Duplicates", duplicate_rows),
+        ("Orphans", orphan_rows),
+    ], report_format)
 
-    with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
-        df_summary.to_excel(writer, index=False, sheet_name="Summary")
-        df_rows.to_excel(writer, index=False, sheet_name="Renames")
+def write_rename_report(report_path: str, summary_row: dict, rows: ReportTable, report_format: str = "xlsx"):
+    """
+    ONE workbook for rename/copy step: Summary + Renames
+    """
+    if not report_path:
+        return ""
+
+    return _write_report(report_path, [
+        ("Summary", ReportTable.from_row(summary_row)),
+        ("Renames", rows),
+    ], report_format)
 
 
 
@@ -135,6 +643,7 @@ def strip_suffix_in_flat_outputs(
     suffix_to_remove: str = "_OCR",
     report_path: str = "",
     log_fn=print,
+    verbose: bool = True,
 ):
     """
     Renames files in a flat folder:
@@ -154,63 +663,69 @@ def strip_suffix_in_flat_outputs(
     output_ext = output_ext.lower()
     suffix_to_remove = (suffix_to_remove or "").strip()
 
-    rows = []
+    rows = ReportTable(FLAT_RENAME_COLUMNS)
     renamed = 0
     skipped = 0
     collisions = 0
     errors = 0
 
-    for name in os.listdir(flat_folder):
-        full = os.path.join(flat_folder, name)
-        if not os.path.isfile(full):
-            continue
+    with os.scandir(flat_folder) as it:
+        flat_entries = [e for e in it if e.is_file()]
 
-        low = name.lower()
-        if not low.endswith(output_ext):
-            continue
+    logbuf = _LogBuffer(log_fn, verbose=verbose)
+    try:
+        for entry in flat_entries:
+            name = entry.name
+            full = entry.path
+
+            low = name.lower()
+            if not low.endswith(output_ext):
+                continue
 
-        if suffix_to_remove:
-            # must end with suffix + ext (case-insensitive)
-            if not low.endswith((suffix_to_remove.lower() + output_ext)):
+            if suffix_to_remove:
+                # must end with suffix + ext (case-insensitive)
+                if not low.endswith((suffix_to_remove.lower() + output_ext)):
+                    skipped += 1
+                    continue
+                new_name = name[: -len(suffix_to_remove) - len(output_ext)] + output_ext
+            else:
+                # nothing to remove
                 skipped += 1
                 continue
-            new_name = name[: -len(suffix_to_remove) - len(output_ext)] + output_ext
-        else:
-            # nothing to remove
-            skipped += 1
-            continue
 
-        dest_full = os.path.join(flat_folder, new_name)
+            dest_full = os.path.join(flat_folder, new_name)
 
-        # collision handling
-        final_dest = dest_full
-        if os.path.exists(final_dest):
-            collisions += 1
-            base2, ext2 = os.path.splitext(dest_full)
-            n = 1
-            while os.path.exists(f"{base2}_{n}{ext2}"):
-                n += 1
-            final_dest = f"{base2}_{n}{ext2}"
+            # collision handling
+            final_dest = dest_full
+            if os.path.exists(final_dest):
+                collisions += 1
+                base2, ext2 = os.path.splitext(dest_full)
+                n = 1
+                while os.path.exists(f"{base2}_{n}{ext2}"):
+                    n += 1
+                final_dest = f"{base2}_{n}{ext2}"
 
-        try:
-            os.rename(full, final_dest)
-            renamed += 1
-            rows.append({
-                "old_full_path": full,
-                "new_full_path": final_dest,
-                "status": "OK",
-                "reason": ""
-            })
-            log_fn(f"✅ Renamed: {name} -> {os.path.basename(final_dest)}")
-        except Exception as e:
-            errors += 1
-            rows.append({
-                "old_full_path": full,
-                "new_full_path": final_dest,
-                "status": "ERROR",
-                "reason": str(e)
-            })
-            log_fn(f"❌ ERROR: {name} -> {e}")
+            try:
+                os.rename(full, final_dest)
+                renamed += 1
+                rows.append(
+                    old_full_path=full,
+                    new_full_path=final_dest,
+                    status="OK",
+                    reason=""
+                )
+                logbuf.success(f"✅ Renamed: {name} -> {os.path.basename(final_dest)}")
+            except Exception as e:
+                errors += 1
+                rows.append(
+                    old_full_path=full,
+                    new_full_path=final_dest,
+                    status="ERROR",
+                    reason=str(e)
+                )
+                logbuf.append(f"❌ ERROR: {name} -> {e}")
+    finally:
+        logbuf.flush()
 
     summary = {
         "flat_folder": flat_folder,
@@ -223,12 +738,7 @@ def strip_suffix_in_flat_outputs(
     }
 
     if report_path:
-        out_dir = os.path.dirname(report_path)
-        if out_dir:
-            ensure_dir(out_dir)
-        with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
-            pd.DataFrame([summary]).to_excel(writer, index=False, sheet_name="Summary")
-            pd.DataFrame(rows).to_excel(writer, index=False, sheet_name="Renames")
+        write_rename_report(report_path, summary, rows)
         log_fn(f"📄 Report written: {report_path}")
 
     log_fn("")
@@ -247,6 +757,12 @@ def build_new_name(filename: str, token: str, separator="__"):
     base, ext = os.path.splitext(filename)
     return f"{base}{separator}{token}{ext}"
 
+PLACE_BATCH = 1024  # pre-OCR placements handed to the pool per slice
+
+def default_max_concurrency() -> int:
+    # copies are I/O bound (often SMB/NAS), so oversubscribe the CPU count
+    return min(32, (os.cpu_count() or 4) * 4)
+
 def pre_ocr_append_token(
     source_root: str,
     mode: str,  # "copy" or "rename"
@@ -258,6 +774,10 @@ def pre_ocr_append_token(
     counter_padding: int,
     report_path: str,
     log_fn=print,
+    max_concurrency: int | None = None,
+    verbose: bool = True,
+    report_format: str = "xlsx",  # "xlsx" or "csv"
+    stream_reports: bool = False,
 ):
     """
     Creates a staging set of files whose names include a unique token:
@@ -266,9 +786,18 @@ def pre_ocr_append_token(
 
     Copy mode preserves original files and writes renamed copies to staging root.
     Rename mode renames in-place (riskier).
+
+    report_format="csv" writes {report}_summary.csv + {report}_renames.csv
+    instead of one workbook. stream_reports=True writes Renames rows to the
+    xlsx as they're produced instead of holding them until the end.
+
+    Runs in two phases: a serial walk that assigns tokens and resolves every
+    destination name (so counter numbering stays deterministic), then the
+    copies/renames themselves on a thread pool of max_concurrency workers.
     """
     if not os.path.isdir(source_root):
         raise ValueError("Source root folder not found.")
+    _known_dirs.clear()
 
     if mode == "copy":
         if not staging_root:
@@ -277,122 +806,217 @@ def pre_ocr_append_token(
 
     if token_mode not in ("counter", "size"):
         raise ValueError("Token mode must be 'counter' or 'size'.")
+    size_tokens = token_mode == "size"
+    if not size_tokens:
+        try:
+            pad_width = max(1, int(counter_padding))
+        except (TypeError, ValueError):
+            raise ValueError("Counter padding must be a whole number.")
+
+    if max_concurrency is None:
+        max_concurrency = default_max_concurrency()
+    max_concurrency = max(1, int(max_concurrency))
 
     scanned = 0
     processed = 0
     skipped = 0
     collisions = 0
     errors = 0
-    rows: list[dict] = []
+    stream, rows = open_rename_report(report_path, stream_reports, report_format)
 
-    counter = 1
+    try:
+        counter = 1
 
-    for root, _, files in os.walk(source_root):
-        files.sort(key=lambda s: s.lower())
-        for name in files:
-            scanned += 1
-            src_full = os.path.join(root, name)
-
-            if filter_enabled and include_exts:
-                if not name.lower().endswith(include_exts):
-                    skipped += 1
-                    continue
+        # Phase 1 (serial): walk, assign tokens, resolve unique destinations
+        tasks: list[tuple[os.DirEntry, str, str]] = []  # (source entry, final_dest, token)
+        # Lowercased destination paths that are taken, either already on disk or
+        # handed out earlier in this run. Each destination folder is listed once
+        # (one readdir) instead of probing os.path.exists per candidate name.
+        claimed: set[str] = set()
+        listed_dirs: set[str] = set()
 
+        def _claim_existing(dest_dir: str):
+            if dest_dir in listed_dirs:
+                return
+            listed_dirs.add(dest_dir)
             try:
-                if token_mode == "size":
-                    token = str(os.path.getsize(src_full))
-                else:
-                    token = str(counter).zfill(max(1, int(counter_padding)))
-                    counter += 1
-            except Exception as e:
-                errors += 1
-                rows.append({
-                    "source_full_path": src_full,
-                    "new_full_path": "",
-                    "original_name": name,
-                    "new_name": "",
-                    "token": "",
-                    "action": mode.upper(),
-                    "status": "ERROR",
-                    "reason": f"Could not create token: {e}",
-                })
-                log_fn(f"❌ ERROR token: {src_full} -> {e}")
-                continue
-
-            new_name = build_new_name(name, token, separator=separator)
+                with os.scandir(dest_dir) as it:
+                    claimed.update(os.path.join(dest_dir, e.name).lower() for e in it)
+            except OSError:
+                pass
 
-            if mode == "rename":
-                dest_full = os.path.join(root, new_name)
-            else:
-                rel_dir = os.path.relpath(root, source_root)
-                rel_dir = "" if rel_dir == "." else rel_dir
-                dest_dir = os.path.join(staging_root, rel_dir)
-                ensure_dir(dest_dir)
-                dest_full = os.path.join(dest_dir, new_name)
-
-            # Collision handling: append _1, _2...
-            final_dest = dest_full
-            if os.path.exists(final_dest):
-                collisions += 1
-                base2, ext2 = os.path.splitext(final_dest)
-                n = 1
-                while os.path.exists(f"{base2}_{n}{ext2}"):
-                    n += 1
-                final_dest = f"{base2}_{n}{ext2}"
+        ext_ok = _ext_matcher(include_exts) if filter_enabled and include_exts else None
 
-            try:
+        logbuf = _LogBuffer(log_fn, verbose=verbose)
+        try:
+            for root, entries in walk_files(source_root):
                 if mode == "rename":
-                    os.rename(src_full, final_dest)
-                    action = "RENAMED"
+                    dest_dir = root
                 else:
-                    shutil.copy2(src_full, final_dest)
-                    action = "COPIED"
-
-                processed += 1
-                rows.append({
-                    "source_full_path": src_full,
-                    "new_full_path": final_dest,
-                    "original_name": name,
-                    "new_name": os.path.basename(final_dest),
-                    "token": token,
-                    "action": action,
-                    "status": "OK",
-                    "reason": ""
-                })
-                log_fn(f"✅ {action}: {name} -> {os.path.basename(final_dest)}")
-            except Exception as e:
-                errors += 1
-                rows.append({
-                    "source_full_path": src_full,
-                    "new_full_path": final_dest,
-                    "original_name": name,
-                    "new_name": os.path.basename(final_dest),
-                    "token": token,
-                    "action": mode.upper(),
-                    "status": "ERROR",
-                    "reason": str(e),
-                })
-                log_fn(f"❌ ERROR copy/rename: {src_full} -> {e}")
-
-    summary = {
-        "mode": mode,
-        "token_mode": token_mode,
-        "counter_padding": counter_padding if token_mode == "counter" else "",
-        "source_root": source_root,
-        "staging_root": staging_root if mode == "copy" else "",
-        "separator": separator,
-        "filter_enabled": filter_enabled,
-        "include_exts": ",".join(include_exts) if include_exts else "",
-        "files_scanned": scanned,
-        "files_processed": processed,
-        "skipped": skipped,
-        "collisions": collisions,
-        "errors": errors,
-    }
-
-    if report_path:
-        write_rename_report(report_path, summary, rows)
-        log_fn(f"📄 Report written: {report_path}")
+                    rel_dir = os.path.relpath(root, source_root)
+                    dest_dir = staging_root if rel_dir == "." else os.path.join(staging_root, rel_dir)
+
+                # Counter tokens follow this order, so it must be reproducible.
+                # Lowercase each name once and reuse it for the extension filter.
+                keyed = sorted(((e.name.lower(), e) for e in entries), key=itemgetter(0))
+                for name_lower, entry in keyed:
+                    scanned += 1
+                    name = entry.name
+                    src_full = entry.path
+
+                    if ext_ok is not None:
+                        if not ext_ok(name_lower):
+                            skipped += 1
+                            continue
+
+                    try:
+                        if size_tokens:
+                            token = str(entry.stat().st_size)
+                        else:
+                            token = f"{counter:0{pad_width}d}"
+                            counter += 1
+                    except Exception as e:
+                        errors += 1
+                        rows.append(
+                            source_full_path=src_full,
+                            new_full_path="",
+                            original_name=name,
+                            new_name="",
+                            token="",
+                            action=mode.upper(),
+                            status="ERROR",
+                            reason=f"Could not create token: {e}",
+                        )
+                        logbuf.append(f"❌ ERROR token: {src_full} -> {e}")
+                        continue
+
+                    new_name = build_new_name(name, token, separator=separator)
+
+                    if mode == "copy":
+                        ensure_dir_once(dest_dir)
+                    dest_full = os.path.join(dest_dir, new_name)
+
+                    # Collision handling: append _1, _2...
+                    _claim_existing(dest_dir)
+                    final_dest = dest_full
+                    dest_key = final_dest.lower()
+                    if dest_key in claimed:
+                        collisions += 1
+                        base2, ext2 = os.path.splitext(final_dest)
+                        n = 1
+                        while f"{base2}_{n}{ext2}".lower() in claimed:
+                            n += 1
+                        final_dest = f"{base2}_{n}{ext2}"
+                        dest_key = final_dest.lower()
+                    claimed.add(dest_key)
+
+                    tasks.append((entry, final_dest, token))
+
+            # Phase 2 (parallel): copy/rename; results come back in task order so
+            # the report and log stay in walk order and logging only happens here
+            dir_fds = None
+            if mode == "rename" and _RENAME_DIR_FD:
+                dir_fds = _DirFdPool(Counter(os.path.dirname(t[1]) for t in tasks))
+            elif mode == "copy" and _COPY_DIR_FD:
+                dir_fds = _DirFdPool(Counter(
+                    d for t in tasks for d in (os.path.dirname(t[0].path), os.path.dirname(t[1]))
+                ))
+
+            def _place(task) -> Exception | None:
+                entry, final_dest = task[0], task[1]
+                try:
+                    if dir_fds is None:
+                        if mode == "rename":
+                            os.rename(entry.path, final_dest)
+                        else:
+                            fast_copy(entry.path, final_dest, entry.stat())
+                    elif mode == "rename":
+                        # rename mode never leaves the source folder
+                        dirpath, new_name = os.path.split(final_dest)
+                        try:
+                            fd = dir_fds.acquire(dirpath)
+                            os.rename(entry.name, new_name, src_dir_fd=fd, dst_dir_fd=fd)
+                        finally:
+                            dir_fds.release(dirpath)
+                    else:
+                        src_dir = os.path.dirname(entry.path)
+                        dst_dir, new_name = os.path.split(final_dest)
+                        try:
+                            try:
+                                _copy_at(dir_fds.acquire(src_dir), entry.name, dir_fds.acquire(dst_dir), new_name, entry.stat())
+                            except OSError:
+                                # e.g. a filesystem without sendfile: take the regular path
+                                fast_copy(entry.path, final_dest, entry.stat())
+                        finally:
+                            dir_fds.release(src_dir)
+                            dir_fds.release(dst_dir)
+                    return None
+                except Exception as e:
+                    return e
+
+            action = "RENAMED" if mode == "rename" else "COPIED"
+
+            with ThreadPoolExecutor(max_workers=max_concurrency) as ex:
+                # bounded slices, like _OutputPlacer's batches: at most PLACE_BATCH futures
+                # alive at once, and each slice is logged as soon as it is placed
+                for start in range(0, len(tasks), PLACE_BATCH):
+                    batch = tasks[start:start + PLACE_BATCH]
+                    for (entry, final_dest, token), err in zip(batch, ex.map(_place, batch)):
+                        src_full, name = entry.path, entry.name
+                        if err is None:
+                            processed += 1
+                            rows.append(
+                                source_full_path=src_full,
+                                new_full_path=final_dest,
+                                original_name=name,
+                                new_name=os.path.basename(final_dest),
+                                token=token,
+                                action=action,
+                                status="OK",
+                                reason=""
+                            )
+                            logbuf.success(f"✅ {action}: {name} -> {os.path.basename(final_dest)}")
+                        else:
+                            errors += 1
+                            rows.append(
+                                source_full_path=src_full,
+                                new_full_path=final_dest,
+                                original_name=name,
+                                new_name=os.path.basename(final_dest),
+                                token=token,
+                                action=mode.upper(),
+                                status="ERROR",
+                                reason=str(err),
+                            )
+                            logbuf.append(f"❌ ERROR copy/rename: {src_full} -> {err}")
+        finally:
+            logbuf.flush()
+
+        summary = {
+            "mode": mode,
+            "token_mode": token_mode,
+            "counter_padding": counter_padding if token_mode == "counter" else "",
+            "source_root": source_root,
+            "staging_root": staging_root if mode == "copy" else "",
+            "separator": separator,
+            "filter_enabled": filter_enabled,
+            "include_exts": ",".join(include_exts) if include_exts else "",
+            "files_scanned": scanned,
+            "files_processed": processed,
+            "skipped": skipped,
+            "collisions": collisions,
+            "errors": errors,
+        }
+
+        if stream is not None:
+            stream.close(summary)
+            log_fn(f"📄 Report written: {report_path}")
+        elif report_path:
+            written = write_rename_report(report_path, summary, rows, report_format)
+            log_fn(f"📄 Report written: {written}")
+    finally:
+        if stream is not None:
+            stream.abort()  # failed part way: release the file; no-op after close()
 
     log_fn("")
     log_fn("===== Summary =====")
@@ -403,6 +1027,120 @@ def pre_ocr_append_token(
     log_fn(f"Errors:      {errors}")
     log_fn("===================")
 
+# =========================================================
+# Shared by Mode A / Mode B: placing matched flat outputs
+# =========================================================
+
+def _strip_placed_token(path_in: str, token_separator: str, token_regex: str, logbuf: _LogBuffer) -> str:
+    """
+    Rename a placed file to drop a trailing token like __000001 from its
+    base name (adding _1, _2... if that name is taken). Returns the final path.
+    """
+    sep = (token_separator or "__")
+    pat = token_regex or r"\d+"
+    fname = os.path.basename(path_in)
+    base, ext = os.path.splitext(fname)
+    m = re.match(rf"^(.*?){re.escape(sep)}({pat})$", base)
+    if not m:
+        return path_in
+    new_base = m.group(1)
+    new_name = new_base + ext
+    # Same folder either way, so comparing names is enough (no abspath/getcwd)
+    if new_name == fname:
+        return path_in
+    candidate = os.path.join(os.path.dirname(path_in), new_name)
+    if os.path.exists(candidate):
+        b2, e2 = os.path.splitext(candidate)
+        n = 1
+        while os.path.exists(f"{b2}_{n}{e2}"):
+            n += 1
+        candidate = f"{b2}_{n}{e2}"
+    try:
+        os.rename(path_in, candidate)
+        logbuf.success(f"🧹 Renamed (strip token): {os.path.basename(path_in)} -> {os.path.basename(candidate)}")
+        return candidate
+    except Exception as e:
+        logbuf.append(f"⚠️ Could not strip token for {os.path.basename(path_in)}: {e}")
+        return path_in
+
+class _OutputPlacer:
+    """
+    Moves/copies flat outputs to their destinations on a thread pool.
+
+    add() queues placements in walk/row order; drain() runs the queue and
+    handles results back in that same order (log lines, optional token
+    strip, counters), so logs and counts match a serial run. A placement
+    whose flat file or destination is already queued drains the queue first,
+    so two workers never touch the same path. The queue is also drained
+    every batch_size placements to keep the log moving.
+    """
+
+    def __init__(self, move_files: bool, strip_token: bool, token_separator: str, token_regex: str,
+                 logbuf: _LogBuffer, max_concurrency: int | None = None, batch_size: int = 1024):
+        if max_concurrency is None:
+            max_concurrency = default_max_concurrency()
+        self.move_files = move_files
+        self.strip_token = strip_token
+        self.token_separator = token_separator
+        self.token_regex = token_regex
+        self.logbuf = logbuf
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(max_concurrency)))
+        self.pending: list[tuple[str, str, str, str]] = []  # (src, dest_path, expected_name, expected_key)
+        self.busy: set[str] = set()  # lowercased src/dest paths of pending placements
+        self.placed = 0
+        self.errors = 0
+        self.used_unique: set[str] = set()
+
+    def add(self, src: str, dest_path: str, expected_name: str, expected_key: str):
+        src_key, dest_key = src.lower(), dest_path.lower()
+        if src_key in self.busy or dest_key in self.busy:
+            self.drain()
+        self.pending.append((src, dest_path, expected_name, expected_key))
+        self.busy.add(src_key)
+        self.busy.add(dest_key)
+        if len(self.pending) >= self.batch_size:
+            self.drain()
+
+    def _place(self, task) -> Exception | None:
+        src, dest_path = task[0], task[1]
+        try:
+            if self.move_files:
+                # Cross-volume moves copy then delete; copy via fast_copy too
+                shutil.move(src, dest_path, copy_function=fast_copy)
+            else:
+                fast_copy(src, dest_path)
+            return None
+        except Exception as e:
+            return e
+
+    def drain(self):
+        tasks, self.pending = self.pending, []
+        self.busy.clear()
+        verb = "Moved" if self.move_files else "Copied"
+        for (src, dest_path, expected_name, expected_key), err in zip(tasks, self.executor.map(self._place, tasks)):
+            try:
+                if err is not None:
+                    raise err
+                self.logbuf.success(f"✅ {verb}: {expected_name} -> {dest_path}")
+
+                # After placing, optionally strip token
+                if self.strip_token:
+                    dest_path = _strip_placed_token(
+                        dest_path, self.token_separator, self.token_regex, self.logbuf
+                    )
+
+                self.placed += 1
+                self.used_unique.add(expected_key)
+            except Exception as e:
+                self.errors += 1
+                self.logbuf.append(f"❌ Error for {expected_name}: {e}")
+
+    def shutdown(self):
+        # Pending placements are dropped if the caller bailed out early
+        self.pending = []
+        self.executor.shutdown(wait=True)
+
 # =========================================================
 # Mode A: Rebuild using ORIGINAL folder structure (template)
 # =========================================================
@@ -422,18 +1160,32 @@ def recreate_from_original_tree(
     token_regex: str = r"\d+",
     report_path: str = "",
     log_fn=print,
+    verbose: bool = True,
+    stream_reports: bool = False,
+    report_format: str = "xlsx",  # "xlsx" or "csv"
+    sort_entries: bool = True,
+    max_concurrency: int | None = None,
 ):
     """
     Walk original_root, recreate folder structure under destination_root,
     and place matching output files (typically PDFs) from flat_output_folder.
 
     Matching rule: base filename from original -> base + output_suffix + output_ext in flat folder.
+
+    stream_reports=True writes report rows to disk as they're found (bounded
+    memory for very large flat folders) instead of one write at the end.
+    report_format="csv" writes {report}_summary.csv, _missing.csv, ... instead
+    of one workbook (much faster for very large reports).
+    sort_entries=False keeps directory-listing order within each folder
+    (saves the sort on huge folders; log/report order is then unspecified).
+    Moves/copies run on max_concurrency worker threads (see _OutputPlacer).
     """
     if not os.path.isdir(original_root):
         raise ValueError("Original root folder doesn't exist.")
     if not os.path.isdir(flat_output_folder):
         raise ValueError("Flat output folder doesn't exist.")
     ensure_dir(destination_root)
+    _known_dirs.clear()
 
     if not output_ext.startswith("."):
         output_ext = "." + output_ext
@@ -441,156 +1193,138 @@ def recreate_from_original_tree(
     output_suffix = (output_suffix or "").strip()
 
     # Index flat outputs (only output_ext)
-    unique_lookup, duplicates, all_files = build_flat_index(flat_output_folder, allowed_exts=(output_ext,))
-
-    duplicate_rows = []
-    for key, paths in duplicates.items():
-        for p in paths:
-            duplicate_rows.append({
-                "flat_filename": os.path.basename(p),
-                "duplicate_count": len(paths),
-                "flat_full_path": p
-            })
-
-    used_unique = set()
-    missing_rows = []
-
-    def should_include_file(pathname: str) -> bool:
-        n = pathname.lower()
-        if n.endswith(output_ext):
-            return False
-        if scan_all:
-            return True
-        return n.endswith(include_exts)
-
-    total_inputs = 0
-    moved_or_copied = 0
-    missing_not_found = 0
-    skipped_duplicates = 0
-    errors = 0
-
-    for root, _, files in os.walk(original_root):
-        files.sort(key=lambda s: s.lower())
-        for file in files:
-            if not should_include_file(file):
-                continue
-
-            total_inputs += 1
-            base = os.path.splitext(file)[0]
-            expected_name = f"{base}{output_suffix}{output_ext}"
-            expected_key = expected_name.lower()
-
-            source_full = os.path.join(root, file)
-            rel_dir = os.path.relpath(root, original_root)
-            target_folder_rel = rel_dir if rel_dir != "." else ""
-
-            # Duplicate handling: skip if duplicates exist in flat folder
-            if expected_key in duplicates:
-                skipped_duplicates += 1
-                missing_rows.append({
-                    "row_index": None,
-                    "source": source_full,
-                    "target_folder_rel": target_folder_rel,
-                    "expected_output_name": expected_name,
-                    "reason": "Duplicate filename in flat folder (skipped)"
-                })
-                log_fn(f"⚠️ Duplicate in flat (skipped): {expected_name} -> from {source_full}")
-                continue
-
-            src = unique_lookup.get(expected_key)
-            if not src:
-                missing_not_found += 1
-                missing_rows.append({
-                    "row_index": None,
-                    "source": source_full,
-                    "target_folder_rel": target_folder_rel,
-                    "expected_output_name": expected_name,
-                    "reason": "Not found in flat folder"
-                })
-                log_fn(f"⚠️ Missing in flat: {expected_name} -> from {source_full}")
-                continue
-
-            dest_dir = os.path.join(destination_root, target_folder_rel)
-            ensure_dir(dest_dir)
-            dest_path = os.path.join(dest_dir, expected_name)
-
-            # Optional: after placing, strip token like __000001 from final filename
-            def _maybe_strip_token(path_in: str) -> str:
-                if not strip_token_after_place:
-                    return path_in
-                sep = (token_separator or "__")
-                pat = token_regex or r"\d+"
-                fname = os.path.basename(path_in)
-                base, ext = os.path.splitext(fname)
-                m = re.match(rf"^(.*?){re.escape(sep)}({pat})$", base)
-                if not m:
-                    return path_in
-                new_base = m.group(1)
-                new_name = new_base + ext
-                candidate = os.path.join(os.path.dirname(path_in), new_name)
-                if os.path.abspath(candidate) == os.path.abspath(path_in):
-                    return path_in
-                if os.path.exists(candidate):
-                    b2, e2 = os.path.splitext(candidate)
-                    n = 1
-                    while os.path.exists(f"{b2}_{n}{e2}"):
-                        n += 1
-                    candidate = f"{b2}_{n}{e2}"
-                try:
-                    os.rename(path_in, candidate)
-                    log_fn(f"🧹 Renamed (strip token): {os.path.basename(path_in)} -> {os.path.basename(candidate)}")
-                    return candidate
-                except Exception as e:
-                    log_fn(f"⚠️ Could not strip token for {os.path.basename(path_in)}: {e}")
-                    return path_in
-
-            try:
-                if move_files:
-                    shutil.move(src, dest_path)
-                    log_fn(f"✅ Moved: {expected_name} -> {dest_path}")
-                else:
-                    shutil.copy2(src, dest_path)
-                    log_fn(f"✅ Copied: {expected_name} -> {dest_path}")
+    unique_lookup, duplicates, all_files, dup_file_count = build_flat_index(flat_output_folder, allowed_exts=(output_ext,))
+    dup_name_count = len(duplicates)
+
+    stream, missing_rows, duplicate_rows, orphan_rows = open_rebuild_report(report_path, stream_reports, report_format)
+
+    try:
+        for key, paths in duplicates.items():
+            for p in paths:
+                duplicate_rows.append(
+                    flat_filename=os.path.basename(p),
+                    duplicate_count=len(paths),
+                    flat_full_path=p
+                )
 
-                # After placing, optionally strip token
-                dest_path = _maybe_strip_token(dest_path)
+        # Pick the include test once, instead of re-checking scan_all per file
+        if scan_all:
+            def should_include_file(name_lower: str) -> bool:
+                return not name_lower.endswith(output_ext)
+        else:
+            ext_ok = _ext_matcher(include_exts)
 
-                moved_or_copied += 1
-                used_unique.add(expected_key)
-            except Exception as e:
-                errors += 1
-                log_fn(f"❌ Error for {expected_name}: {e}")
+            def should_include_file(name_lower: str) -> bool:
+                return not name_lower.endswith(output_ext) and ext_ok(name_lower)
 
-    # Orphans: any flat output not used + all duplicates (never touched)
-    orphan_rows = []
-    for key, paths in all_files.items():
-        for p in paths:
-            if key in duplicates or key not in used_unique:
-                orphan_rows.append({"flat_filename": os.path.basename(p), "flat_full_path": p})
+        suffix_ext = output_suffix + output_ext
+        suffix_ext_lower = suffix_ext.lower()
 
-    summary = {
-        "mode": "Original structure template",
-        "original_root": original_root,
-        "flat_output_folder": flat_output_folder,
-        "destination_root": destination_root,
-        "action": "move" if move_files else "copy",
-        "output_ext": output_ext,
-        "output_suffix": output_suffix,
-        "scan_all": scan_all,
-        "include_exts": ",".join(include_exts) if include_exts else "",
-        "inputs_scanned": total_inputs,
-        "moved_or_copied": moved_or_copied,
-        "missing_not_found": missing_not_found,
-        "skipped_duplicates": skipped_duplicates,
-        "duplicate_filenames_in_flat": len(duplicates),
-        "duplicate_files_in_flat": sum(len(v) for v in duplicates.values()),
-        "orphans_total": len(orphan_rows),
-        "errors": errors,
-    }
+        total_inputs = 0
+        moved_or_copied = 0
+        missing_not_found = 0
+        skipped_duplicates = 0
+        errors = 0
 
-    if report_path:
-        write_report_one_workbook(report_path, summary, missing_rows, duplicate_rows, orphan_rows)
-        log_fn(f"📄 Report written: {report_path}")
+        logbuf = _LogBuffer(log_fn, verbose=verbose)
+        placer = _OutputPlacer(
+            move_files, strip_token_after_place, token_separator, token_regex, logbuf, max_concurrency
+        )
+        try:
+            for root, entries in walk_files(original_root):
+                # Case-insensitive name order, as before: besides the log/report order it
+                # decides which of two names differing only by case claims the one flat
+                # file (flat keys are lowercased). Each name is lowercased once.
+                keyed = [(e.name.lower(), e) for e in entries]
+                if sort_entries:
+                    keyed.sort(key=itemgetter(0))
+                rel_dir = os.path.relpath(root, original_root)
+                target_folder_rel = rel_dir if rel_dir != "." else ""
+                dest_dir = os.path.join(destination_root, target_folder_rel)
+                for file_lower, entry in keyed:
+                    file = entry.name
+                    if not should_include_file(file_lower):
+                        continue
+
+                    total_inputs += 1
+                    base = os.path.splitext(file)[0]
+                    expected_name = base + suffix_ext
+                    expected_key = base.lower() + suffix_ext_lower
+
+                    source_full = entry.path
+
+                    # Duplicate handling: skip if duplicates exist in flat folder
+                    if expected_key in duplicates:
+                        skipped_duplicates += 1
+                        missing_rows.append(
+                            row_index=None,
+                            source=source_full,
+                            target_folder_rel=target_folder_rel,
+                            expected_output_name=expected_name,
+                            reason="Duplicate filename in flat folder (skipped)"
+                        )
+                        logbuf.append(f"⚠️ Duplicate in flat (skipped): {expected_name} -> from {source_full}")
+                        continue
+
+                    src = unique_lookup.get(expected_key)
+                    if not src:
+                        missing_not_found += 1
+                        missing_rows.append(
+                            row_index=None,
+                            source=source_full,
+                            target_folder_rel=target_folder_rel,
+                            expected_output_name=expected_name,
+                            reason="Not found in flat folder"
+                        )
+                        logbuf.append(f"⚠️ Missing in flat: {expected_name} -> from {source_full}")
+                        continue
+
+                    ensure_dir_once(dest_dir)
+                    placer.add(src, os.path.join(dest_dir, expected_name), expected_name, expected_key)
+            placer.drain()
+        finally:
+            placer.shutdown()
+            logbuf.flush()
+
+        moved_or_copied = placer.placed
+        errors += placer.errors
+        used_unique = placer.used_unique
+
+        # Orphans: unique flat outputs that were never placed. Duplicates are
+        # never placed either, but they're already listed on the Duplicates sheet.
+        for key in sorted(unique_lookup.keys() - used_unique):
+            p = unique_lookup[key]
+            orphan_rows.append(flat_filename=os.path.basename(p), flat_full_path=p)
+
+        summary = {
+            "mode": "Original structure template",
+            "original_root": original_root,
+            "flat_output_folder": flat_output_folder,
+            "destination_root": destination_root,
+            "action": "move" if move_files else "copy",
+            "output_ext": output_ext,
+            "output_suffix": output_suffix,
+            "scan_all": scan_all,
+            "include_exts": ",".join(include_exts) if include_exts else "",
+            "inputs_scanned": total_inputs,
+            "moved_or_copied": moved_or_copied,
+            "missing_not_found": missing_not_found,
+            "skipped_duplicates": skipped_duplicates,
+            "duplicate_filenames_in_flat": dup_name_count,
+            "duplicate_files_in_flat": dup_file_count,
+            "orphans_total": len(orphan_rows),
+            "errors": errors,
+        }
+
+        if stream is not None:
+            stream.close(summary)
+            log_fn(f"📄 Report written: {report_path}")
+        elif report_path:
+            written = write_report_one_workbook(report_path, summary, missing_rows, duplicate_rows, orphan_rows, report_format)
+            log_fn(f"📄 Report written: {written}")
+    finally:
+        if stream is not None:
+            stream.abort()  # failed part way: release the file; no-op after close()
 
     log_fn("")
     log_fn("===== Summary =====")
@@ -598,8 +1332,8 @@ def recreate_from_original_tree(
     log_fn(f"Moved/Copied:               {moved_or_copied}")
     log_fn(f"Missing (not found):        {missing_not_found}")
     log_fn(f"Skipped (duplicates):       {skipped_duplicates}")
-    log_fn(f"Duplicate filenames (flat): {len(duplicates)}")
-    log_fn(f"Duplicate files (flat):     {sum(len(v) for v in duplicates.values())}")
+    log_fn(f"Duplicate filenames (flat): {dup_name_count}")
+    log_fn(f"Duplicate files (flat):     {dup_file_count}")
     log_fn(f"Orphans total:              {len(orphan_rows)}")
     log_fn(f"Errors:                     {errors}")
     log_fn("===================")
@@ -608,6 +1342,54 @@ def recreate_from_original_tree(
 # Mode B: Rebuild using XLSX mapping (Directory + Name etc.)
 # =========================================================
 
+@lru_cache(maxsize=65536)
+def _target_folder_rel(target_folder: str, directory_is_full_path: bool) -> str:
+    """
+    Mapping folder -> folder relative to destination_root.
+    """
+    if directory_is_full_path:
+        return strip_drive_and_leading_slashes(target_folder)
+    return target_folder.lstrip("\\").rstrip("\\")
+
+def read_sheet_columns(spreadsheet_path: str, sheet_name: str) -> list:
+    """
+    Header row of one sheet (nrows=0: no data rows are parsed).
+    """
+    import pandas as pd
+
+    header = pd.read_excel(spreadsheet_path, sheet_name=sheet_name, nrows=0, engine=READ_ENGINE)
+    return list(header.columns)
+
+def read_sheet_names(spreadsheet_path: str) -> list[str]:
+    import pandas as pd
+
+    with pd.ExcelFile(spreadsheet_path, engine=READ_ENGINE) as xls:
+        return list(xls.sheet_names)
+
+def read_mapping_columns(spreadsheet_path: str, sheet_name: str, directory_col: str, name_col: str):
+    """
+    Read ONLY the directory/name columns of the mapping sheet, as strings.
+
+    The header row is checked first (nrows=0) so a wrong column name fails
+    fast instead of after parsing the whole sheet.
+    """
+    import pandas as pd
+
+    header = read_sheet_columns(spreadsheet_path, sheet_name)
+    if directory_col not in header:
+        raise ValueError(f"Directory column '{directory_col}' not found in sheet '{sheet_name}'.")
+    if name_col not in header:
+        raise ValueError(f"Name column '{name_col}' not found in sheet '{sheet_name}'.")
+
+    cols = list(dict.fromkeys([directory_col, name_col]))
+    return pd.read_excel(
+        spreadsheet_path,
+        sheet_name=sheet_name,
+        usecols=cols,
+        dtype={c: "string" for c in cols},
+        engine=READ_ENGINE,
+    )
+
 def process_from_excel_mapping(
     spreadsheet_path: str,
     sheet_name: str,
@@ -625,182 +1407,154 @@ def process_from_excel_mapping(
     move_files: bool = True,
     report_path: str = "",
     log_fn=print,
+    verbose: bool = True,
+    stream_reports: bool = False,
+    report_format: str = "xlsx",  # "xlsx" or "csv"
+    max_concurrency: int | None = None,
 ):
     """
     Uses spreadsheet mapping to place outputs from flat folder into recreated structure.
 
     IMPORTANT: ext mismatch is expected (e.g. DGN/TIF -> PDF). We match on base name only:
       Name: "thing" OR "thing.dgn" -> expected output "thing" + suffix + ".pdf"
+
+    stream_reports / report_format / max_concurrency: see recreate_from_original_tree.
     """
     if not os.path.isfile(spreadsheet_path):
         raise ValueError("Spreadsheet file not found.")
     if not os.path.isdir(flat_folder):
         raise ValueError("Flat folder not found.")
     ensure_dir(destination_root)
+    _known_dirs.clear()
+    for cached in (normalize_path, strip_drive_and_leading_slashes, _target_folder_rel):
+        cached.cache_clear()
 
     if not output_ext.startswith("."):
         output_ext = "." + output_ext
     output_ext = output_ext.lower()
     output_suffix = (output_suffix or "").strip()
 
-    df = pd.read_excel(spreadsheet_path, sheet_name=sheet_name)
-
-    if directory_col not in df.columns:
-        raise ValueError(f"Directory column '{directory_col}' not found in sheet '{sheet_name}'.")
-    if name_col not in df.columns:
-        raise ValueError(f"Name column '{name_col}' not found in sheet '{sheet_name}'.")
+    df = read_mapping_columns(spreadsheet_path, sheet_name, directory_col, name_col)
 
     # Index flat outputs (only output_ext)
-    unique_lookup, duplicates, all_files = build_flat_index(flat_folder, allowed_exts=(output_ext,))
-
-    duplicate_rows = []
-    for key, paths in duplicates.items():
-        for p in paths:
-            duplicate_rows.append({
-                "flat_filename": os.path.basename(p),
-                "duplicate_count": len(paths),
-                "flat_full_path": p
-            })
-
-    used_unique = set()
-    missing_rows = []
-
-    rows_considered = 0
-    moved_or_copied = 0
-    missing_not_found = 0
-    skipped_duplicates = 0
-    errors = 0
-
-    for idx, row in df.iterrows():
-        dir_val = row.get(directory_col, "")
-        name_val = row.get(name_col, "")
-
-        if pd.isna(dir_val) or str(dir_val).strip() == "" or pd.isna(name_val) or str(name_val).strip() == "":
-            continue
-
-        directory_value = normalize_path(dir_val)
-
-        base_name_raw = str(name_val).strip()
-        base_name = os.path.splitext(base_name_raw)[0].strip()
-
-        expected_name = f"{base_name}{output_suffix}{output_ext}"
-        expected_key = expected_name.lower()
-
-        rows_considered += 1
-
-        target_folder = os.path.dirname(directory_value)
-
-        if directory_is_full_path:
-            target_folder_rel = strip_drive_and_leading_slashes(target_folder)
-        else:
-            target_folder_rel = target_folder.lstrip("\\").rstrip("\\")
-
-        if expected_key in duplicates:
-            skipped_duplicates += 1
-            missing_rows.append({
-                "row_index": idx,
-                "source": directory_value,
-                "target_folder_rel": target_folder_rel,
-                "expected_output_name": expected_name,
-                "reason": "Duplicate filename in flat folder (skipped)"
-            })
-            log_fn(f"⚠️ Duplicate in flat (skipped): {expected_name} (row {idx})")
-            continue
-
-        src = unique_lookup.get(expected_key)
-        if not src:
-            missing_not_found += 1
-            missing_rows.append({
-                "row_index": idx,
-                "source": directory_value,
-                "target_folder_rel": target_folder_rel,
-                "expected_output_name": expected_name,
-                "reason": "Not found in flat folder"
-            })
-            log_fn(f"⚠️ Missing in flat: {expected_name} (row {idx})")
-            continue
-
-        dest_dir = os.path.join(destination_root, target_folder_rel)
-        ensure_dir(dest_dir)
-        dest_path = os.path.join(dest_dir, expected_name)
-
-        # Optional: after placing, strip token like __000001 from final filename
-        def _maybe_strip_token(path_in: str) -> str:
-            if not strip_token_after_place:
-                return path_in
-            sep = (token_separator or "__")
-            pat = token_regex or r"\d+"
-            fname = os.path.basename(path_in)
-            base, ext = os.path.splitext(fname)
-            m = re.match(rf"^(.*?){re.escape(sep)}({pat})$", base)
-            if not m:
-                return path_in
-            new_base = m.group(1)
-            new_name = new_base + ext
-            candidate = os.path.join(os.path.dirname(path_in), new_name)
-            if os.path.abspath(candidate) == os.path.abspath(path_in):
-                return path_in
-            if os.path.exists(candidate):
-                b2, e2 = os.path.splitext(candidate)
-                n = 1
-                while os.path.exists(f"{b2}_{n}{e2}"):
-                    n += 1
-                candidate = f"{b2}_{n}{e2}"
-            try:
-                os.rename(path_in, candidate)
-                log_fn(f"🧹 Renamed (strip token): {os.path.basename(path_in)} -> {os.path.basename(candidate)}")
-                return candidate
-            except Exception as e:
-                log_fn(f"⚠️ Could not strip token for {os.path.basename(path_in)}: {e}")
-                return path_in
+    unique_lookup, duplicates, all_files, dup_file_count = build_flat_index(flat_folder, allowed_exts=(output_ext,))
+    dup_name_count = len(duplicates)
+
+    stream, missing_rows, duplicate_rows, orphan_rows = open_rebuild_report(report_path, stream_reports, report_format)
+
+    try:
+        for key, paths in duplicates.items():
+            for p in paths:
+                duplicate_rows.append(
+                    flat_filename=os.path.basename(p),
+                    duplicate_count=len(paths),
+                    flat_full_path=p
+                )
 
+        rows_considered = 0
+        moved_or_copied = 0
+        missing_not_found = 0
+        skipped_duplicates = 0
+        errors = 0
+
+        # Column-wise prep (no iterrows): clean, drop blanks, derive names/folders
+        dir_s = df[directory_col].astype("string").str.strip()
+        name_s = df[name_col].astype("string").str.strip()
+        mask = (dir_s.notna() & name_s.notna() & (dir_s != "") & (name_s != "")).fillna(False).astype(bool)
+        dir_s = dir_s[mask].str.replace("/", "\\", regex=False)
+        name_s = name_s[mask]
+
+        # Same as os.path.splitext(name)[0]: drop the last ".ext", but keep
+        # leading-dot names like ".hidden" intact
+        base_s = name_s.str.replace(r"(?<=[^.\\/])(\.*)\.[^.\\/]*$", r"\1", regex=True).str.strip()
+        expected_s = base_s + (output_suffix + output_ext)
+        expected_key_s = expected_s.str.lower()
+        # Same as (Windows) os.path.dirname on the normalized directory value
+        folder_s = dir_s.str.extract(r"^(.*?)\\+[^\\]*$", expand=False).fillna("")
+
+        logbuf = _LogBuffer(log_fn, verbose=verbose)
+        placer = _OutputPlacer(
+            move_files, strip_token_after_place, token_separator, token_regex, logbuf, max_concurrency
+        )
         try:
-            if move_files:
-                shutil.move(src, dest_path)
-                log_fn(f"✅ Moved: {expected_name} -> {dest_path}")
-            else:
-                shutil.copy2(src, dest_path)
-                log_fn(f"✅ Copied: {expected_name} -> {dest_path}")
-
-            # After placing, optionally strip token
-            dest_path = _maybe_strip_token(dest_path)
-
-            moved_or_copied += 1
-            used_unique.add(expected_key)
-        except Exception as e:
-            errors += 1
-            log_fn(f"❌ Error for {expected_name}: {e}")
-
-    orphan_rows = []
-    for key, paths in all_files.items():
-        for p in paths:
-            if key in duplicates or key not in used_unique:
-                orphan_rows.append({"flat_filename": os.path.basename(p), "flat_full_path": p})
+            for idx, directory_value, target_folder, expected_name, expected_key in zip(
+                dir_s.index, dir_s, folder_s, expected_s, expected_key_s
+            ):
+                rows_considered += 1
+
+                target_folder_rel = _target_folder_rel(target_folder, directory_is_full_path)
+
+                if expected_key in duplicates:
+                    skipped_duplicates += 1
+                    missing_rows.append(
+                        row_index=idx,
+                        source=directory_value,
+                        target_folder_rel=target_folder_rel,
+                        expected_output_name=expected_name,
+                        reason="Duplicate filename in flat folder (skipped)"
+                    )
+                    logbuf.append(f"⚠️ Duplicate in flat (skipped): {expected_name} (row {idx})")
+                    continue
 
-    summary = {
-        "mode": "XLSX mapping",
-        "spreadsheet": spreadsheet_path,
-        "worksheet": sheet_name,
-        "directory_col": directory_col,
-        "name_col": name_col,
-        "flat_folder": flat_folder,
-        "destination_root": destination_root,
-        "action": "move" if move_files else "copy",
-        "output_ext": output_ext,
-        "output_suffix": output_suffix,
-        "rows_considered": rows_considered,
-        "moved_or_copied": moved_or_copied,
-        "missing_not_found": missing_not_found,
-        "skipped_duplicates": skipped_duplicates,
-        "duplicate_filenames_in_flat": len(duplicates),
-        "duplicate_files_in_flat": sum(len(v) for v in duplicates.values()),
-        "orphans_total": len(orphan_rows),
-        "errors": errors,
-    }
+                src = unique_lookup.get(expected_key)
+                if not src:
+                    missing_not_found += 1
+                    missing_rows.append(
+                        row_index=idx,
+                        source=directory_value,
+                        target_folder_rel=target_folder_rel,
+                        expected_output_name=expected_name,
+                        reason="Not found in flat folder"
+                    )
+                    logbuf.append(f"⚠️ Missing in flat: {expected_name} (row {idx})")
+                    continue
 
-    if report_path:
-        write_report_one_workbook(report_path, summary, missing_rows, duplicate_rows, orphan_rows)
-        log_fn(f"📄 Report written: {report_path}")
+                dest_dir = os.path.join(destination_root, target_folder_rel)
+                ensure_dir_once(dest_dir)
+                placer.add(src, os.path.join(dest_dir, expected_name), expected_name, expected_key)
+            placer.drain()
+        finally:
+            placer.shutdown()
+            logbuf.flush()
+
+        moved_or_copied = placer.placed
+        errors += placer.errors
+        used_unique = placer.used_unique
+
+        for key in sorted(unique_lookup.keys() - used_unique):
+            p = unique_lookup[key]
+            orphan_rows.append(flat_filename=os.path.basename(p), flat_full_path=p)
+
+        summary = {
+            "mode": "XLSX mapping",
+            "spreadsheet": spreadsheet_path,
+            "worksheet": sheet_name,
+            "directory_col": directory_col,
+            "name_col": name_col,
+            "flat_folder": flat_folder,
+            "destination_root": destination_root,
+            "action": "move" if move_files else "copy",
+            "output_ext": output_ext,
+            "output_suffix": output_suffix,
+            "rows_considered": rows_considered,
+            "moved_or_copied": moved_or_copied,
+            "missing_not_found": missing_not_found,
+            "skipped_duplicates": skipped_duplicates,
+            "duplicate_filenames_in_flat": dup_name_count,
+            "duplicate_files_in_flat": dup_file_count,
+            "orphans_total": len(orphan_rows),
+            "errors": errors,
+        }
+
+        if stream is not None:
+            stream.close(summary)
+            log_fn(f"📄 Report written: {report_path}")
+        elif report_path:
+            written = write_report_one_workbook(report_path, summary, missing_rows, duplicate_rows, orphan_rows, report_format)
+            log_fn(f"📄 Report written: {written}")
+    finally:
+        if stream is not None:
+            stream.abort()  # failed part way: release the file; no-op after close()
 
     log_fn("")
     log_fn("===== Summary =====")
@@ -808,8 +1562,8 @@ def process_from_excel_mapping(
     log_fn(f"Moved/Copied:               {moved_or_copied}")
     log_fn(f"Missing (not found):        {missing_not_found}")
     log_fn(f"Skipped (duplicates):       {skipped_duplicates}")
-    log_fn(f"Duplicate filenames (flat): {len(duplicates)}")
-    log_fn(f"Duplicate files (flat):     {sum(len(v) for v in duplicates.values())}")
+    log_fn(f"Duplicate filenames (flat): {dup_name_count}")
+    log_fn(f"Duplicate files (flat):     {dup_file_count}")
     log_fn(f"Orphans total:              {len(orphan_rows)}")
     log_fn(f"Errors:                     {errors}")
     log_fn("===================")
@@ -819,6 +1573,8 @@ def process_from_excel_mapping(
 # =========================================================
 
 class AllInOneApp(tk.Tk):
+    LOG_DRAIN_MS = 100
+
     def __init__(self):
         super().__init__()
         self.title("All-in-One: Pre-OCR Token Rename + Rebuild Structure (Template + XLSX)")
@@ -845,6 +1601,11 @@ class AllInOneApp(tk.Tk):
         self._build_tab_template()
         self._build_tab_xlsx()
 
+        # Worker threads put (widget, msg) here; _drain_log moves them into
+        # the Text widgets every LOG_DRAIN_MS, one insert per widget
+        self._log_queue: queue.Queue = queue.Queue()
+        self.after(self.LOG_DRAIN_MS, self._drain_log)
+
     
     # ---------------- Guide tab ----------------
     def _build_tab_guide(self):
@@ -945,6 +1706,8 @@ Before doing 100k files, test on one small folder:
         self.p_source = tk.StringVar()
         self.p_staging = tk.StringVar()
         self.p_report = tk.StringVar()
+        self.p_report_format = tk.StringVar(value="xlsx")
+        self.p_workers = tk.IntVar(value=default_max_concurrency())
 
         self.p_mode = tk.StringVar(value="copy")  # safer default
         self.p_separator = tk.StringVar(value="__")
@@ -966,9 +1729,10 @@ Before doing 100k files, test on one small folder:
         ttk.Entry(frm, textvariable=self.p_staging, width=120).grid(row=3, column=0, sticky="we")
         ttk.Button(frm, text="Browse…", command=lambda: self._pick_folder(self.p_staging)).grid(row=3, column=1, padx=8)
 
-        ttk.Label(frm, text="Report workbook (.xlsx):").grid(row=4, column=0, sticky="w")
+        ttk.Label(frm, text="Report file:").grid(row=4, column=0, sticky="w")
         ttk.Entry(frm, textvariable=self.p_report, width=120).grid(row=5, column=0, sticky="we")
-        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.p_report)).grid(row=5, column=1, padx=8)
+        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.p_report, self.p_report_format.get())).grid(row=5, column=1, padx=8)
+        self._report_format_radios(frm, self.p_report_format, row=5, path_var=self.p_report)
 
         opts = ttk.LabelFrame(self.tab_token, text="Token options")
         opts.pack(fill="x", padx=10, pady=6)
@@ -1007,6 +1771,7 @@ Before doing 100k files, test on one small folder:
         self.p_run_btn = ttk.Button(btns, text="Run", command=self._run_token)
         self.p_run_btn.pack(side="left")
         ttk.Button(btns, text="Clear Log", command=lambda: self._clear_log(self.p_log)).pack(side="left", padx=10)
+        self._workers_spinbox(btns, self.p_workers)
 
         self.p_log = tk.Text(self.tab_token, height=22, wrap="word")
         self.p_log.pack(fill="both", expand=True, padx=10, pady=10)
@@ -1034,6 +1799,7 @@ Before doing 100k files, test on one small folder:
         filter_enabled = bool(self.p_filter.get())
         include_exts = parse_extensions(self.p_exts.get()) if filter_enabled else ()
 
+        workers = self._read_workers(self.p_workers)
         self.p_run_btn.config(state="disabled")
         self._log(self.p_log, "")
         self._log(self.p_log, "Running…")
@@ -1050,7 +1816,9 @@ Before doing 100k files, test on one small folder:
                     token_mode=token_mode,
                     counter_padding=padding,
                     report_path=report,
-                    log_fn=lambda m: self.after(0, self._log, self.p_log, m),
+                    log_fn=self._queue_log(self.p_log),
+                    report_format=self.p_report_format.get(),
+                    max_concurrency=workers,
                 )
                 self.after(0, lambda: messagebox.showinfo("Done", "Finished pre-OCR token rename/copy."))
             except Exception as e:
@@ -1119,7 +1887,7 @@ Before doing 100k files, test on one small folder:
                     output_ext=output_ext,
                     suffix_to_remove=suffix,
                     report_path=report,
-                    log_fn=lambda m: self.after(0, self._log, self.o_log, m),
+                    log_fn=self._queue_log(self.o_log),
                 )
                 self.after(0, lambda: messagebox.showinfo("Done", "Finished removing suffix from flat outputs."))
             except Exception as e:
@@ -1139,6 +1907,8 @@ Before doing 100k files, test on one small folder:
         self.t_report = tk.StringVar()
 
         self.t_action = tk.StringVar(value="move")
+        self.t_report_format = tk.StringVar(value="xlsx")
+        self.t_workers = tk.IntVar(value=default_max_concurrency())
         self.t_scan_mode = tk.StringVar(value="all")
         self.t_exts = tk.StringVar(value="doc,docx,xls,xlsx,dwg,dgn,msg,jpg,jpeg,png,tif,tiff")
         self.t_output_ext = tk.StringVar(value=".pdf")
@@ -1160,9 +1930,10 @@ Before doing 100k files, test on one small folder:
         ttk.Entry(frm, textvariable=self.t_dest, width=120).grid(row=5, column=0, sticky="we")
         ttk.Button(frm, text="Browse…", command=lambda: self._pick_folder(self.t_dest)).grid(row=5, column=1, padx=8)
 
-        ttk.Label(frm, text="Report workbook (.xlsx) (one file with sheets):").grid(row=6, column=0, sticky="w")
+        ttk.Label(frm, text="Report file (XLSX: one workbook with sheets; CSV: one file per sheet):").grid(row=6, column=0, sticky="w")
         ttk.Entry(frm, textvariable=self.t_report, width=120).grid(row=7, column=0, sticky="we")
-        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.t_report)).grid(row=7, column=1, padx=8)
+        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.t_report, self.t_report_format.get())).grid(row=7, column=1, padx=8)
+        self._report_format_radios(frm, self.t_report_format, row=7, path_var=self.t_report)
 
         opts = ttk.Frame(self.tab_template)
         opts.pack(fill="x", **pad)
@@ -1208,6 +1979,7 @@ Before doing 100k files, test on one small folder:
         self.t_run_btn = ttk.Button(btns, text="Run", command=self._run_template)
         self.t_run_btn.pack(side="left")
         ttk.Button(btns, text="Clear Log", command=lambda: self._clear_log(self.t_log)).pack(side="left", padx=10)
+        self._workers_spinbox(btns, self.t_workers)
 
         self.t_log = tk.Text(self.tab_template, height=22, wrap="word")
         self.t_log.pack(fill="both", expand=True, padx=10, pady=10)
@@ -1243,6 +2015,7 @@ Before doing 100k files, test on one small folder:
                 messagebox.showerror("Extensions needed", "Please enter at least one extension for filtered scan.")
                 return
 
+        workers = self._read_workers(self.t_workers)
         self.t_run_btn.config(state="disabled")
         self._log(self.t_log, "")
         self._log(self.t_log, "Running…")
@@ -1262,7 +2035,9 @@ Before doing 100k files, test on one small folder:
                     token_separator=self.t_token_sep.get(),
                     token_regex=self.t_token_regex.get(),
                     report_path=report,
-                    log_fn=lambda m: self.after(0, self._log, self.t_log, m),
+                    log_fn=self._queue_log(self.t_log),
+                    report_format=self.t_report_format.get(),
+                    max_concurrency=workers,
                 )
                 self.after(0, lambda: messagebox.showinfo("Done", "Finished rebuilding folder structure (template mode)."))
             except Exception as e:
@@ -1288,6 +2063,8 @@ Before doing 100k files, test on one small folder:
         self.x_output_suffix = tk.StringVar(value="_OCR")
 
         self.x_action = tk.StringVar(value="move")
+        self.x_report_format = tk.StringVar(value="xlsx")
+        self.x_workers = tk.IntVar(value=default_max_concurrency())
         self.x_dir_fullpath = tk.BooleanVar(value=False)
 
         self.x_sheet_names = []
@@ -1314,9 +2091,10 @@ Before doing 100k files, test on one small folder:
         ttk.Entry(frm, textvariable=self.x_dest, width=120).grid(row=7, column=0, sticky="we")
         ttk.Button(frm, text="Browse…", command=lambda: self._pick_folder(self.x_dest)).grid(row=7, column=1, padx=8)
 
-        ttk.Label(frm, text="Report workbook (.xlsx) (one file with sheets):").grid(row=8, column=0, sticky="w")
+        ttk.Label(frm, text="Report file (XLSX: one workbook with sheets; CSV: one file per sheet):").grid(row=8, column=0, sticky="w")
         ttk.Entry(frm, textvariable=self.x_report, width=120).grid(row=9, column=0, sticky="we")
-        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.x_report)).grid(row=9, column=1, padx=8)
+        ttk.Button(frm, text="Save as…", command=lambda: self._pick_report(self.x_report, self.x_report_format.get())).grid(row=9, column=1, padx=8)
+        self._report_format_radios(frm, self.x_report_format, row=9, path_var=self.x_report)
 
         cols = ttk.LabelFrame(self.tab_xlsx, text="Select headers (from chosen worksheet)")
         cols.pack(fill="x", padx=10, pady=6)
@@ -1374,6 +2152,7 @@ Before doing 100k files, test on one small folder:
         self.x_run_btn = ttk.Button(btns, text="Run", command=self._run_xlsx)
         self.x_run_btn.pack(side="left")
         ttk.Button(btns, text="Clear Log", command=lambda: self._clear_log(self.x_log)).pack(side="left", padx=10)
+        self._workers_spinbox(btns, self.x_workers)
 
         self.x_log = tk.Text(self.tab_xlsx, height=22, wrap="word")
         self.x_log.pack(fill="both", expand=True, padx=10, pady=10)
@@ -1384,6 +2163,24 @@ Before doing 100k files, test on one small folder:
         widget.insert("end", msg + "\n")
         widget.see("end")
 
+    def _queue_log(self, widget: tk.Text):
+        """
+        log_fn for worker threads: just enqueue, never touch Tk directly.
+        """
+        return lambda msg: self._log_queue.put((widget, msg))
+
+    def _drain_log(self):
+        pending: dict[tk.Text, list[str]] = {}
+        try:
+            while True:
+                widget, msg = self._log_queue.get_nowait()
+                pending.setdefault(widget, []).append(msg)
+        except queue.Empty:
+            pass
+        for widget, msgs in pending.items():
+            self._log(widget, "\n".join(msgs))
+        self.after(self.LOG_DRAIN_MS, self._drain_log)
+
     def _clear_log(self, widget: tk.Text):
         widget.delete("1.0", "end")
 
@@ -1392,17 +2189,42 @@ Before doing 100k files, test on one small folder:
         if path:
             var.set(path)
 
-    def _pick_report(self, var: tk.StringVar):
+    def _pick_report(self, var: tk.StringVar, report_format: str = "xlsx"):
+        ext = "." + report_format
         path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel Workbook", "*.xlsx")],
-            title="Save report workbook as",
+            defaultextension=ext,
+            filetypes=[("Excel Workbook", "*.xlsx")] if report_format == "xlsx" else [("CSV files", "*.csv")],
+            title="Save report as",
         )
         if path:
-            if not path.lower().endswith(".xlsx"):
-                path += ".xlsx"
+            if not path.lower().endswith(ext):
+                path += ext
             var.set(path)
 
+    def _report_format_radios(self, parent, var: tk.StringVar, row: int, path_var: tk.StringVar | None = None):
+        def _match_ext():
+            # keep an already chosen report path's extension in step with the format
+            path = path_var.get().strip() if path_var is not None else ""
+            root, ext = os.path.splitext(path)
+            if path and ext.lower() in (".xlsx", ".csv"):
+                path_var.set(root + "." + var.get())
+
+        box = ttk.Frame(parent)
+        box.grid(row=row, column=2, sticky="w")
+        ttk.Radiobutton(box, text="XLSX", variable=var, value="xlsx", command=_match_ext).pack(side="left")
+        ttk.Radiobutton(box, text="CSV", variable=var, value="csv", command=_match_ext).pack(side="left", padx=(6, 0))
+
+    def _workers_spinbox(self, parent, var: tk.IntVar):
+        ttk.Label(parent, text="Workers:").pack(side="left", padx=(30, 0))
+        ttk.Spinbox(parent, from_=1, to=64, textvariable=var, width=5).pack(side="left", padx=6)
+
+    def _read_workers(self, var: tk.IntVar) -> int:
+        """Copy/move thread count from a spinbox; blank or junk -> the default."""
+        try:
+            return max(1, int(var.get()))
+        except (tk.TclError, ValueError):
+            return default_max_concurrency()
+
     def _pick_excel(self):
         path = filedialog.askopenfilename(
             filetypes=[("Excel Workbook", "*.xlsx *.xls")],
@@ -1414,8 +2236,7 @@ Before doing 100k files, test on one small folder:
         self.x_file.set(path)
 
         try:
-            xls = pd.ExcelFile(path)
-            self.x_sheet_names = xls.sheet_names
+            self.x_sheet_names = read_sheet_names(path)
             self.x_sheet_combo["values"] = self.x_sheet_names
             if self.x_sheet_names:
                 self.x_sheet.set(self.x_sheet_names[0])
@@ -1430,8 +2251,7 @@ Before doing 100k files, test on one small folder:
             return
 
         try:
-            df = pd.read_excel(path, sheet_name=sheet, nrows=1)
-            self.x_columns = list(df.columns)
+            self.x_columns = read_sheet_columns(path, sheet)
             self.x_dir_combo["values"] = self.x_columns
             self.x_name_combo["values"] = self.x_columns
 
@@ -1476,6 +2296,7 @@ Before doing 100k files, test on one small folder:
             messagebox.showerror("Bad destination", "Destination cannot be the same as the flat folder when moving.")
             return
 
+        workers = self._read_workers(self.x_workers)
         self.x_run_btn.config(state="disabled")
         self._log(self.x_log, "")
         self._log(self.x_log, "Running…")
@@ -1497,7 +2318,9 @@ Before doing 100k files, test on one small folder:
                     directory_is_full_path=bool(self.x_dir_fullpath.get()),
                     move_files=move_files,
                     report_path=report,
-                    log_fn=lambda m: self.after(0, self._log, self.x_log, m),
+                    log_fn=self._queue_log(self.x_log),
+                    report_format=self.x_report_format.get(),
+                    max_concurrency=workers,
                 )
                 self.after(0, lambda: messagebox.showinfo("Done", "Finished placing files from XLSX mapping."))
             except Exception as e:
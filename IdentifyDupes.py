@@ -1,10 +1,15 @@
+import numpy as np
 import pandas as pd
 import re
+from importlib.util import find_spec
 
 # ===== CONFIG =====
 file_path    = r"filepath/filename.xlsx"
 sheet_name   = "Documents"
 output_sheet = "Dupe Decisions"
+# "" -> add/replace output_sheet inside file_path (keeps its other sheets; slow on big loadsheets)
+# a path -> write output_sheet to that new workbook instead (xlsxwriter if installed: much faster)
+output_path  = ""
 
 COL_DOC    = "Document Name"
 COL_SIZE   = "File size"
@@ -19,39 +24,46 @@ COL_EXT    = "Ext"                      # optional; only used if GROUP_BY needs
 #   "doc_rev_ext"   -> Document + Revision + Ext (ignores size, keeps format separate)
 GROUP_BY = "doc_size_rev"
 
+# True -> also write the normalized _doc_norm/_rev_norm/_size_norm_str/_ext_norm columns
+# (handy for diagnosing grouping; off by default to keep the output sheet lean)
+DEBUG = False
+
 # ===== Helpers =====
-def truthy(x):
-    if pd.isna(x): return False
-    if isinstance(x, bool): return x
-    return str(x).strip().lower() in {"true","yes","y","1","t"}
-
-def parse_majmin(s):
-    """'2.10' -> (2,10), '1.3.5' -> (1,3,5), blanks -> (0,)"""
-    if pd.isna(s) or str(s).strip()=="":
-        return (0,)
-    parts = re.split(r"[^\d]+", str(s).strip())
-    nums = tuple(int(p) for p in parts if p.isdigit())
-    return nums or (0,)
+_NUM_RE = re.compile(r"\d+")  # digit runs in a Maj&Min value
+
+# Column-at-a-time versions (no per-row .apply); blanks/NaN handled like before.
+def truthy_col(s):
+    """True/'yes'/'y'/'1'/'t' (any case, padded) -> True; NaN and everything else -> False"""
+    return s.notna() & s.astype(str).str.strip().str.lower().isin({"true","yes","y","1","t"})
+
+def parse_majmin_col(s):
+    """'2.10' -> (2,10), '1.3.5' -> (1,3,5), blanks -> (0,); tuples padded to 4"""
+    return [
+        pad_tuple(tuple(int(p) for p in nums) or (0,), 4)
+        for nums in s.fillna("").astype(str).str.findall(_NUM_RE)
+    ]
 
 def pad_tuple(t, n=4):
     return t + (0,)*(n-len(t)) if len(t) < n else t
 
-def norm_num_str(x, null_value="-1"):
-    """Return a canonical string for numeric-like values:
+def norm_num_str_col(s, null_value="-1"):
+    """Canonical strings for a numeric column:
        77428 -> '77428', 77428.0 -> '77428', 1.1 -> '1.1', NaN -> null_value."""
-    if pd.isna(x): return null_value
-    try:
-        v = float(x)
-        return str(int(v)) if v.is_integer() else str(v)
-    except Exception:
-        s = str(x).strip()
-        return null_value if s=="" else s
+    out = s.astype(str)
+    is_int = s.notna() & (s % 1 == 0)
+    fits = is_int & (s.abs() < 2**63)  # int64-safe; bigger whole numbers go through int()
+    out[fits] = s[fits].astype("int64").astype(str)
+    out[is_int & ~fits] = [str(int(v)) for v in s[is_int & ~fits]]
+    out[s.isna()] = null_value
+    return out
 
-def norm_text(s):
-    return "" if pd.isna(s) else str(s).strip()
+def norm_text_col(s):
+    return s.astype(str).str.strip().where(s.notna(), "")
 
 # ===== Load =====
-df = pd.read_excel(file_path, sheet_name=sheet_name)
+# python-calamine (Rust reader) if installed: much faster than openpyxl on big loadsheets
+read_engine = "calamine" if find_spec("python_calamine") else None
+df = pd.read_excel(file_path, sheet_name=sheet_name, engine=read_engine)
 print(f"Loaded {len(df)} rows from '{sheet_name}' - {file_path}")
 print("Now running duplicate-check process...")
 
@@ -64,13 +76,13 @@ for c in [COL_DOC, COL_SIZE, COL_REV]:
         raise ValueError(f"Missing required column: {c}")
 
 # Normalise core fields
-df["_doc_norm"]  = df[COL_DOC].apply(norm_text)
-df["_rev_norm"]  = df[COL_REV].apply(norm_text)
+df["_doc_norm"]  = norm_text_col(df[COL_DOC])
+df["_rev_norm"]  = norm_text_col(df[COL_REV])
 
 # size as numeric first, then canonical string
 df[COL_SIZE] = pd.to_numeric(df[COL_SIZE], errors="coerce")
 df["_size_norm"] = df[COL_SIZE]  # keep numeric for reference
-df["_size_norm_str"] = df["_size_norm"].apply(lambda x: norm_num_str(x, null_value="-1"))
+df["_size_norm_str"] = norm_num_str_col(df["_size_norm"], null_value="-1")
 
 # Optional fields
 if COL_EXT in df.columns:
@@ -78,58 +90,63 @@ if COL_EXT in df.columns:
 else:
     df["_ext_norm"] = ""
 
-df["_is_latest_bool"] = df[COL_LATEST].apply(truthy) if COL_LATEST in df.columns else False
+df["_is_latest_bool"] = truthy_col(df[COL_LATEST]) if COL_LATEST in df.columns else False
 df["_majmin_tuple"]   = (
-    df[COL_MAJMIN].apply(parse_majmin).apply(lambda t: pad_tuple(t, 4))
+    parse_majmin_col(df[COL_MAJMIN])
     if COL_MAJMIN in df.columns else [(0,)*4]*len(df)
 )
 
 # ===== Dupe key (switchable) =====
 if GROUP_BY == "doc_rev":
-    df["_dupe_key"] = df["_doc_norm"] + "||" + df["_rev_norm"]
+    key_cols = ["_doc_norm", "_rev_norm"]
 elif GROUP_BY == "doc_rev_ext":
-    df["_dupe_key"] = df["_doc_norm"] + "||" + df["_rev_norm"] + "||" + df["_ext_norm"]
+    key_cols = ["_doc_norm", "_rev_norm", "_ext_norm"]
 else:  # "doc_size_rev"
-    df["_dupe_key"] = df["_doc_norm"] + "||" + df["_size_norm_str"] + "||" + df["_rev_norm"]
-
-# Defaults
-df["Dupe Action"]   = "keep"
-df["Dupe Reason"]   = "unique (no duplicates)"
-df["Dupe Conflict"] = ""
-
-# ===== Decide per group =====
-for key, g in df.groupby("_dupe_key", sort=False):  # don't reorder groups
-    if len(g) == 1:
-        continue
-
-    g_latest = g[g["_is_latest_bool"]]
-    if len(g_latest) >= 1:
-        max_mm = g_latest["_majmin_tuple"].max()
-        latest_max = g_latest[g_latest["_majmin_tuple"] == max_mm]
-        if len(latest_max) > 1:
-            idx_keep = latest_max.index.min()  # keep the first seen
-            df.loc[latest_max.index, "Dupe Conflict"] = "both isLatest=True & same Maj&Min"
-            reason_keep   = "kept (both IsLatest=True & same Maj&Min; kept first)"
-            reason_remove = "removed (duplicate: IsLatest=True tie; not first)"
-        else:
-            idx_keep = latest_max.index[0]
-            reason_keep   = "kept (IsLatest=True and highest Maj&Min)"
-            reason_remove = "removed (duplicate: lower IsLatest/Maj&Min)"
-    else:
-        max_mm = g["_majmin_tuple"].max()
-        ties = g[g["_majmin_tuple"] == max_mm]
-        if len(ties) > 1:
-            idx_keep = ties.index.min()
-            reason_keep   = "kept (tie on Maj&Min; kept first)"
-            reason_remove = "removed (duplicate: tie on Maj&Min; not first)"
-        else:
-            idx_keep = ties.index[0]
-            reason_keep   = "kept (highest Maj&Min)"
-            reason_remove = "removed (older Maj&Min)"
-
-    df.loc[g.index, "Dupe Action"] = "remove"
-    df.loc[g.index, "Dupe Reason"] = reason_remove
-    df.loc[idx_keep, ["Dupe Action","Dupe Reason"]] = ["keep", reason_keep]
+    key_cols = ["_doc_norm", "_size_norm_str", "_rev_norm"]
+# integer group id instead of a concatenated string: later groupbys hash ints, not strings.
+# Rows with a blank (NaN) key part get -1 from ngroup -> NaN, i.e. never grouped (as before)
+df["_dupe_key"] = df.groupby(key_cols, sort=False).ngroup().where(lambda k: k >= 0)
+
+# ===== Decide per group (column-wise, no per-group Python) =====
+# Maj&Min tuples -> ints with the same ordering, so groupby max/compare work on numbers
+mm_rank = {t: i for i, t in enumerate(sorted(set(df["_majmin_tuple"])))}
+mm_key = pd.Series([mm_rank[t] for t in df["_majmin_tuple"]], index=df.index)
+
+key = df["_dupe_key"]
+is_latest = df["_is_latest_bool"].astype(bool)
+grp_size = key.groupby(key, sort=False).transform("size")
+has_latest = is_latest.groupby(key, sort=False).transform("any").fillna(False).astype(bool)
+
+# Candidates: the isLatest rows if the group has any, else every row.
+# Ties: candidates on the group's highest Maj&Min; the first one (original order) is kept.
+candidate = is_latest | ~has_latest
+max_mm = mm_key.where(candidate, -1).groupby(key, sort=False).transform("max")
+tie = candidate & (mm_key == max_mm)
+tied = tie.groupby(key, sort=False).transform("sum") > 1
+first_tie = df["_orig_order"].where(tie).groupby(key, sort=False).transform("min")
+keep = tie & (df["_orig_order"] == first_tie)
+
+dup = grp_size.fillna(1) > 1  # rows with no key (NaN) are left as unique
+conds = [
+    ~dup,
+    has_latest & tied,
+    has_latest & ~tied,
+    ~has_latest & tied,
+    ~has_latest & ~tied,
+]
+df["Dupe Action"] = np.where(dup & ~keep, "remove", "keep")
+df["Dupe Reason"] = np.select(conds, [
+    "unique (no duplicates)",
+    np.where(keep, "kept (both IsLatest=True & same Maj&Min; kept first)",
+                   "removed (duplicate: IsLatest=True tie; not first)"),
+    np.where(keep, "kept (IsLatest=True and highest Maj&Min)",
+                   "removed (duplicate: lower IsLatest/Maj&Min)"),
+    np.where(keep, "kept (tie on Maj&Min; kept first)",
+                   "removed (duplicate: tie on Maj&Min; not first)"),
+    np.where(keep, "kept (highest Maj&Min)",
+                   "removed (older Maj&Min)"),
+], default="")
+df["Dupe Conflict"] = np.where(dup & has_latest & tied & tie, "both isLatest=True & same Maj&Min", "")
 
 # ===== Output (preserve original order) =====
 preferred = [
@@ -141,14 +158,30 @@ preferred = [
 preferred = [c for c in preferred if c is not None]
 
 aux_drop = {"_dupe_key", "_is_latest_bool", "_majmin_tuple"}
-# keep debug columns to help diagnose grouping
+# debug columns help diagnose grouping; only written when DEBUG is on
 debug_cols = ["_doc_norm","_rev_norm","_size_norm_str","_ext_norm"]
 rest = [c for c in df.columns if c not in set(preferred) | aux_drop | set(debug_cols) | {"_orig_order"}]
 
-out = df.sort_values("_orig_order")[preferred + debug_cols + rest]
-
-with pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as w:
-    out.to_excel(w, sheet_name=output_sheet, index=False)
+out = df.sort_values("_orig_order")[preferred + (debug_cols if DEBUG else []) + rest]
 
-print(f"Wrote '{output_sheet}' with keep/remove decisions, reasons, and conflict flags. Grouping: {GROUP_BY} - {file_path}")
+if output_path:
+    # Fresh workbook: nothing to preserve, so use the fast writer if available
+    engine = "xlsxwriter" if find_spec("xlsxwriter") else "openpyxl"
+    with pd.ExcelWriter(output_path, engine=engine) as w:
+        out.to_excel(w, sheet_name=output_sheet, index=False)
+else:
+    # Load the workbook once and replace output_sheet in place (same tab position, other
+    # sheets untouched); rows go straight in with ws.append instead of through to_excel
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path)
+    sheet_ix = wb.sheetnames.index(output_sheet) if output_sheet in wb.sheetnames else None
+    if sheet_ix is not None:
+        del wb[output_sheet]
+    ws = wb.create_sheet(output_sheet, sheet_ix)
+    ws.append(list(out.columns))
+    for row in out.astype(object).where(out.notna(), None).itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(file_path)
+
+print(f"Wrote '{output_sheet}' with keep/remove decisions, reasons, and conflict flags. Grouping: {GROUP_BY} - {output_path or file_path}")
 
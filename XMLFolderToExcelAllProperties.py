@@ -1,18 +1,34 @@
 # tool for extracting all properties from XML files in a folder and exporting to Excel
 
-import xml.etree.ElementTree as ET
 import pandas as pd
+
+# lxml (libxml2) parses much faster than the stdlib parser; fall back when it isn't installed
+try:
+    from lxml import etree as ET
+    ITERPARSE_OPTS = {"huge_tree": True, "remove_blank_text": True, "collect_ids": False}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    ITERPARSE_OPTS = {}
 import glob
 import os
 from collections import Counter
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import zip_longest
 
 # Folder containing XML files (must be a folder)
-xml_folder = r"C:\Users\corri\Kinsmen Group\P25025 Plains Adept to Meridian Migration Project - Documents\6. Data Migration\PROD Location Loadsheets\"  # <-- change if needed
+xml_folder = r"C:\Users\corri\Kinsmen Group\P25025 Plains Adept to Meridian Migration Project - Documents\6. Data Migration\PROD Location Loadsheets"  # <-- change if needed
+
+# Output format: "xlsx", or "parquet"/"feather" (need pyarrow; much faster to write and to load in pandas)
+output_format = "xlsx"
+# xlsxwriter writes xlsx much faster than openpyxl; used when installed
+XLSX_ENGINE = "xlsxwriter" if find_spec("xlsxwriter") else "openpyxl"
 
 xml_files = glob.glob(os.path.join(xml_folder, "*.xml"))
 print(f"Found {len(xml_files)} XML files.")
 
-all_rows = []
+columns = {}  # header -> values, one list per column
+n_rows = 0
 
 def make_unique_headers(headers):
     """
@@ -26,67 +42,133 @@ def make_unique_headers(headers):
         unique.append(h if counts[h] == 1 else f"{h} ({counts[h]})")
     return unique
 
-for xml_file in xml_files:
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-
-        # ---- Build ordered property definitions ----
-        with_ix = []
-        no_ix = []
-
-        for pd_node in root.findall(".//PropertyDefs/PropertyDef"):
-            display = pd_node.get("_DISPLAYNAME") or pd_node.get("_INTERNALNAME") or "Unnamed"
-            internal = pd_node.get("_INTERNALNAME") or ""
-            ix = pd_node.get("ix")
-
-            if ix is not None:
-                with_ix.append((int(ix), display, internal))
-            else:
-                no_ix.append((display, internal))  # keep in document order
-
-        with_ix.sort(key=lambda x: x[0])
-
-        max_ix = with_ix[-1][0] if with_ix else -1
-        next_ix = max_ix + 1
 
-        all_defs = []
-        for ix, display, internal in with_ix:
-            all_defs.append((ix, display, internal))
-
-        for display, internal in no_ix:
-            all_defs.append((next_ix, display, internal))
-            next_ix += 1
+def add_file_columns(columns, n_rows, file_columns, file_rows):
+    """
+    Append one file's columns to the combined ones (one list per header, kept in
+    first-seen order like DataFrame(list_of_dicts) would). Headers missing on either
+    side are padded with None so every list stays the same length.
+    Returns the new row count.
+    """
+    for header, values in file_columns.items():
+        col = columns.get(header)
+        if col is None:
+            col = columns[header] = [None] * n_rows
+        col.extend(values)
+
+    n_rows += file_rows
+    for col in columns.values():
+        if len(col) < n_rows:
+            col.extend([None] * (n_rows - len(col)))
+    return n_rows
+
+
+def write_table(df, output_path, output_format):
+    """Write df as xlsx (xlsxwriter when installed, else openpyxl), parquet or feather."""
+    if output_format == "parquet":
+        df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    elif output_format == "feather":
+        df.to_feather(output_path, compression="zstd")
+    else:
+        df.to_excel(output_path, index=False, engine=XLSX_ENGINE)
+
+
+@lru_cache(maxsize=None)
+def property_layout(with_ix, no_ix):
+    """
+    Ordered (ix, display, internal) defs and their unique headers for one PropertyDefs
+    signature. Cached: files from the same export almost always share one schema.
+    """
+    # ---- Build ordered property definitions ----
+    with_ix = sorted(with_ix, key=lambda x: x[0])
 
-        # Make headers unique (because display names can repeat)
-        headers = [d[1] for d in all_defs]
-        unique_headers = make_unique_headers(headers)
+    max_ix = with_ix[-1][0] if with_ix else -1
+    next_ix = max_ix + 1
 
-        # ---- Extract each Record ----
-        for record in root.findall(".//Record"):
-            props = record.findall("./Property")
+    all_defs = list(with_ix)
+    for display, internal in no_ix:
+        all_defs.append((next_ix, display, internal))
+        next_ix += 1
 
-            row = {"SourceFile": os.path.basename(xml_file)}
+    # Make headers unique (because display names can repeat)
+    headers = [d[1] for d in all_defs]
+    return tuple(all_defs), tuple(make_unique_headers(headers))
 
-            # Fill values based on defs
-            for (ix, _display, _internal), header in zip(all_defs, unique_headers):
-                row[header] = props[ix].text.strip() if ix < len(props) and props[ix].text else ""
 
-            # If there are MORE Property values than defs, keep them too
-            if len(props) > len(all_defs):
-                for extra_i in range(len(all_defs), len(props)):
-                    extra_val = props[extra_i].text.strip() if props[extra_i].text else ""
-                    row[f"ExtraProperty_{extra_i}"] = extra_val
+def read_xml_file(xml_file):
+    """
+    Stream one XML file with iterparse instead of building the whole tree.
+    Returns (with_ix, no_ix, records): the PropertyDefs split the same way as before,
+    and for each Record the stripped text of its <Property> children.
+    Elements are cleared and dropped from their parent as soon as they are read,
+    so memory holds one record at a time rather than the full document.
+    """
+    with_ix = []
+    no_ix = []
+    records = []
+    stack = []  # open elements, root first
+
+    for event, elem in ET.iterparse(xml_file, events=("start", "end"), **ITERPARSE_OPTS):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        tag = elem.tag
+
+        # same matches as root.findall(".//PropertyDefs/PropertyDef") / (".//Record")
+        if tag == "PropertyDefs" and stack:
+            for pd_node in elem.iterfind("PropertyDef"):
+                display = pd_node.get("_DISPLAYNAME") or pd_node.get("_INTERNALNAME") or "Unnamed"
+                internal = pd_node.get("_INTERNALNAME") or ""
+                ix = pd_node.get("ix")
+
+                if ix is not None:
+                    with_ix.append((int(ix), display, internal))
+                else:
+                    no_ix.append((display, internal))  # keep in document order
+        elif tag == "Record" and stack:
+            records.append([(p.text or "").strip() for p in elem if p.tag == "Property"])
+        else:
+            continue
+
+        elem.clear()
+        del stack[-1][-1]  # the element just closed is always its parent's last child
+
+    return with_ix, no_ix, records
 
-            all_rows.append(row)
+for xml_file in xml_files:
+    try:
+        with_ix, no_ix, records = read_xml_file(xml_file)
+        all_defs, unique_headers = property_layout(tuple(with_ix), tuple(no_ix))
+
+        # ---- Extract each Record, one column at a time ----
+        if not records:
+            continue
+        file_columns = {"SourceFile": [os.path.basename(xml_file)] * len(records)}
+
+        # Fill values based on defs: transpose records -> per-position columns in one
+        # C-level pass (short records pad with "")
+        by_position = list(zip_longest(*records, fillvalue=""))
+        most_props = len(by_position)
+        missing = ("",) * len(records)
+        for (ix, _display, _internal), header in zip(all_defs, unique_headers):
+            file_columns[header] = by_position[ix] if ix < most_props else missing
+
+        # If there are MORE Property values than defs, keep them too
+        for extra_i in range(len(all_defs), most_props):
+            file_columns[f"ExtraProperty_{extra_i}"] = [
+                props[extra_i] if extra_i < len(props) else None for props in records
+            ]
+
+        n_rows = add_file_columns(columns, n_rows, file_columns, len(records))
 
     except Exception as e:
         print(f"⚠ Error reading {xml_file}: {e}")
 
-df = pd.DataFrame(all_rows)
+df = pd.DataFrame(columns)
 
-output_path = os.path.join(xml_folder, "combined_output_missingtitles.xlsx")
-df.to_excel(output_path, index=False)
+output_path = os.path.join(xml_folder, f"combined_output_missingtitles.{output_format}")
+write_table(df, output_path, output_format)
 
 print(f"✅ Done! Extracted {len(df)} records from {len(xml_files)} XML files.")
 print(f"📄 Output saved to: {output_path}")
@@ -3,13 +3,41 @@
 
 import os
 import glob
+import hashlib
+import json
+import queue
+import time
 import threading
+from concurrent.futures import ProcessPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from collections import Counter
-import xml.etree.ElementTree as ET
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import zip_longest
 import pandas as pd
 
+# Output formats offered in the GUI; parquet/feather need pyarrow and load far faster in pandas/Power BI
+OUTPUT_FORMATS = ("xlsx", "parquet", "feather")
+# xlsxwriter writes xlsx much faster than openpyxl; used when installed
+XLSX_ENGINE = "xlsxwriter" if find_spec("xlsxwriter") else "openpyxl"
+
+# Optional parse cache (off unless ticked in the GUI): one JSON file per parsed XML in a
+# per-user cache folder, never in the (often shared) XML folder. Entries are keyed by a hash of
+# the file's name + content, so only new or changed files get parsed again. JSON, not pickle:
+# loading an entry can't run code. Bump CACHE_VERSION when parse output changes.
+CACHE_APP_NAME = "XMLFolderToExcel"
+CACHE_VERSION = 2
+CACHE_MAX_AGE_DAYS = 30  # entries not hit for this long are pruned
+
+# lxml (libxml2) parses much faster than the stdlib parser; fall back when it isn't installed
+try:
+    from lxml import etree as ET
+    ITERPARSE_OPTS = {"huge_tree": True, "remove_blank_text": True, "collect_ids": False}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    ITERPARSE_OPTS = {}
+
 
 def make_unique_headers(headers):
     counts = Counter()
@@ -20,7 +48,196 @@ def make_unique_headers(headers):
     return unique
 
 
-def extract_xml_folder_to_excel(xml_folder: str, output_filename: str, status_cb=None) -> str:
+def add_file_columns(columns, n_rows, file_columns, file_rows):
+    """
+    Append one file's columns to the combined ones (one list per header, kept in
+    first-seen order like DataFrame(list_of_dicts) would). Headers missing on either
+    side are padded with None so every list stays the same length.
+    Returns the new row count.
+    """
+    for header, values in file_columns.items():
+        col = columns.get(header)
+        if col is None:
+            col = columns[header] = [None] * n_rows
+        col.extend(values)
+
+    n_rows += file_rows
+    for col in columns.values():
+        if len(col) < n_rows:
+            col.extend([None] * (n_rows - len(col)))
+    return n_rows
+
+
+def write_table(df, output_path, output_format):
+    """Write df as xlsx (xlsxwriter when installed, else openpyxl), parquet or feather."""
+    if output_format == "parquet":
+        df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    elif output_format == "feather":
+        df.to_feather(output_path, compression="zstd")
+    else:
+        df.to_excel(output_path, index=False, engine=XLSX_ENGINE)
+
+
+def read_xml_file(xml_file):
+    """
+    Stream one XML file with iterparse instead of building the whole tree.
+    Returns (with_ix, no_ix, records): the PropertyDefs split the same way as before,
+    and for each Record the stripped text of its <Property> children.
+    Elements are cleared and dropped from their parent as soon as they are read,
+    so memory holds one record at a time rather than the full document.
+    """
+    with_ix = []
+    no_ix = []
+    records = []
+    stack = []  # open elements, root first
+
+    for event, elem in ET.iterparse(xml_file, events=("start", "end"), **ITERPARSE_OPTS):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        tag = elem.tag
+
+        # same matches as root.findall(".//PropertyDefs/PropertyDef") / (".//Record")
+        if tag == "PropertyDefs" and stack:
+            for pd_node in elem.iterfind("PropertyDef"):
+                display = pd_node.get("_DISPLAYNAME") or pd_node.get("_INTERNALNAME") or "Unnamed"
+                internal = pd_node.get("_INTERNALNAME") or ""
+                ix = pd_node.get("ix")
+
+                if ix is not None:
+                    with_ix.append((int(ix), display, internal))
+                else:
+                    no_ix.append((display, internal))  # keep in document order
+        elif tag == "Record" and stack:
+            records.append([(p.text or "").strip() for p in elem if p.tag == "Property"])
+        else:
+            continue
+
+        elem.clear()
+        del stack[-1][-1]  # the element just closed is always its parent's last child
+
+    return with_ix, no_ix, records
+
+
+@lru_cache(maxsize=None)
+def property_layout(with_ix, no_ix):
+    """
+    Ordered (ix, display, internal) defs and their unique headers for one PropertyDefs
+    signature. Cached: files from the same export almost always share one schema.
+    """
+    # ---- Build ordered property definitions ----
+    with_ix = sorted(with_ix, key=lambda x: x[0])
+
+    max_ix = with_ix[-1][0] if with_ix else -1
+    next_ix = max_ix + 1
+
+    all_defs = list(with_ix)
+    for display, internal in no_ix:
+        all_defs.append((next_ix, display, internal))
+        next_ix += 1
+
+    headers = [d[1] for d in all_defs]
+    return tuple(all_defs), tuple(make_unique_headers(headers))
+
+
+def parse_one_xml(xml_file):
+    """
+    (row_count, {header: values}) for one XML file.
+    Runs in a worker process, so it must stay top-level.
+    """
+    try:
+        with_ix, no_ix, records = read_xml_file(xml_file)
+        all_defs, unique_headers = property_layout(tuple(with_ix), tuple(no_ix))
+
+        # ---- Extract each Record, one column at a time ----
+        if not records:
+            return 0, {}
+        columns = {"SourceFile": [os.path.basename(xml_file)] * len(records)}
+
+        # transpose records -> per-position columns in one C-level pass (short records pad with "")
+        by_position = list(zip_longest(*records, fillvalue=""))
+        most_props = len(by_position)
+        missing = ("",) * len(records)
+        for (ix, _display, _internal), header in zip(all_defs, unique_headers):
+            columns[header] = by_position[ix] if ix < most_props else missing
+
+        for extra_i in range(len(all_defs), most_props):
+            columns[f"ExtraProperty_{extra_i}"] = [
+                props[extra_i] if extra_i < len(props) else None for props in records
+            ]
+
+        return len(records), columns
+
+    except Exception as e:
+        # Keep going; log error as a row so you can see what failed
+        return 1, {
+            "SourceFile": [os.path.basename(xml_file)],
+            "ERROR": [str(e)]
+        }
+
+
+def user_cache_dir():
+    """Per-user cache folder (%LOCALAPPDATA% on Windows, XDG cache dir elsewhere)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_APP_NAME, "parse_cache")
+
+
+def cache_file_for(cache_dir, xml_file):
+    """Cache entry path for xml_file's current name + content (None if it can't be read)."""
+    h = hashlib.blake2b(f"{CACHE_VERSION}|{os.path.basename(xml_file)}|".encode(), digest_size=16)
+    try:
+        with open(xml_file, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return os.path.join(cache_dir, h.hexdigest() + ".json")
+
+
+def load_cached(cache_file):
+    """(row_count, {header: values}) from a cache entry; None if missing or not that shape."""
+    try:
+        with open(cache_file, encoding="utf-8") as fh:
+            n, columns = json.load(fh)
+        os.utime(cache_file)  # mark as used so pruning keeps it
+    except (OSError, ValueError, TypeError):
+        return None  # missing/corrupt cache -> just parse again
+    if not isinstance(n, int) or not isinstance(columns, dict) \
+            or not all(isinstance(v, list) and len(v) == n for v in columns.values()):
+        return None
+    return n, columns
+
+
+def save_cached(cache_file, result):
+    # best effort: a failed cache write must never fail the export
+    tmp = f"{cache_file}.{os.getpid()}.tmp"  # the cache is shared between runs
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump([result[0], {h: list(v) for h, v in result[1].items()}], fh, ensure_ascii=False)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir):
+    """Drop cache entries that haven't been used for CACHE_MAX_AGE_DAYS."""
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 86400
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def extract_xml_folder_to_excel(xml_folder: str, output_filename: str, status_cb=None,
+                                output_format: str = "xlsx", use_cache: bool = False) -> str:
     if not os.path.isdir(xml_folder):
         raise ValueError("The selected XML folder does not exist.")
 
@@ -31,76 +248,58 @@ def extract_xml_folder_to_excel(xml_folder: str, output_filename: str, status_cb
     if not xml_files:
         raise ValueError("No .xml files found in the selected folder.")
 
-    # Ensure .xlsx extension
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    # Ensure the extension matches the format (swap a typed .xlsx/.parquet/.feather)
     output_filename = output_filename.strip()
     if not output_filename:
         raise ValueError("Please enter an output file name.")
-    if not output_filename.lower().endswith(".xlsx"):
-        output_filename += ".xlsx"
-
-    all_rows = []
-
-    for i, xml_file in enumerate(xml_files, start=1):
-        if status_cb:
-            status_cb(f"Reading {i}/{len(xml_files)}: {os.path.basename(xml_file)}")
-
-        try:
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            # ---- Build ordered property definitions ----
-            with_ix = []
-            no_ix = []
-
-            for pd_node in root.findall(".//PropertyDefs/PropertyDef"):
-                display = pd_node.get("_DISPLAYNAME") or pd_node.get("_INTERNALNAME") or "Unnamed"
-                internal = pd_node.get("_INTERNALNAME") or ""
-                ix = pd_node.get("ix")
-
-                if ix is not None:
-                    with_ix.append((int(ix), display, internal))
-                else:
-                    no_ix.append((display, internal))
-
-            with_ix.sort(key=lambda x: x[0])
-
-            max_ix = with_ix[-1][0] if with_ix else -1
-            next_ix = max_ix + 1
-
-            all_defs = [(ix, display, internal) for ix, display, internal in with_ix]
-            for display, internal in no_ix:
-                all_defs.append((next_ix, display, internal))
-                next_ix += 1
-
-            headers = [d[1] for d in all_defs]
-            unique_headers = make_unique_headers(headers)
-
-            # ---- Extract each Record ----
-            for record in root.findall(".//Record"):
-                props = record.findall("./Property")
-                row = {"SourceFile": os.path.basename(xml_file)}
-
-                for (ix, _display, _internal), header in zip(all_defs, unique_headers):
-                    row[header] = props[ix].text.strip() if ix < len(props) and props[ix].text else ""
-
-                if len(props) > len(all_defs):
-                    for extra_i in range(len(all_defs), len(props)):
-                        extra_val = props[extra_i].text.strip() if props[extra_i].text else ""
-                        row[f"ExtraProperty_{extra_i}"] = extra_val
-
-                all_rows.append(row)
-
-        except Exception as e:
-            # Keep going; log error as a row so you can see what failed
-            all_rows.append({
-                "SourceFile": os.path.basename(xml_file),
-                "ERROR": str(e)
-            })
-
-    df = pd.DataFrame(all_rows)
+    name_root, name_ext = os.path.splitext(output_filename)
+    if name_ext.lower().lstrip(".") in OUTPUT_FORMATS:
+        output_filename = name_root
+    output_filename += "." + output_format
+
+    columns = {}
+    n_rows = 0
+
+    # With the cache on, unchanged files come from it; only the rest get parsed
+    cache_dir = user_cache_dir()
+    cache_files = {}
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_files = {f: cache_file_for(cache_dir, f) for f in xml_files}
+    to_parse = [f for f in xml_files if not (cache_files.get(f) and os.path.exists(cache_files[f]))]
+    if status_cb and len(to_parse) < len(xml_files):
+        status_cb(f"{len(xml_files) - len(to_parse)} unchanged file(s) will be read from cache.")
+
+    # Files are independent and parsing is CPU-bound: spread them over processes.
+    # Windows caps ProcessPoolExecutor at 61 workers.
+    workers = max(1, min(len(to_parse), os.cpu_count() or 1, 61))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        parsed = ex.map(parse_one_xml, to_parse, chunksize=4)  # yields in to_parse (= file) order
+        to_parse = set(to_parse)
+        for i, xml_file in enumerate(xml_files, start=1):
+            cache_file = cache_files.get(xml_file)
+            result = next(parsed) if xml_file in to_parse else load_cached(cache_file)
+            fresh = xml_file in to_parse or result is None
+            if result is None:  # cache file vanished or is unreadable
+                result = parse_one_xml(xml_file)
+            if cache_file and fresh and "ERROR" not in result[1]:
+                save_cached(cache_file, result)
+
+            file_rows, file_columns = result
+            n_rows = add_file_columns(columns, n_rows, file_columns, file_rows)
+            if status_cb:
+                status_cb(f"Read {i}/{len(xml_files)}: {os.path.basename(xml_file)}")
+
+    if use_cache:
+        prune_cache(cache_dir)
+
+    df = pd.DataFrame(columns)
 
     output_path = os.path.join(xml_folder, output_filename)
-    df.to_excel(output_path, index=False)
+    write_table(df, output_path, output_format)
 
     if status_cb:
         status_cb(f"Done! Wrote {len(df)} row(s) to {output_filename}")
@@ -109,14 +308,18 @@ def extract_xml_folder_to_excel(xml_folder: str, output_filename: str, status_cb
 
 
 class App(tk.Tk):
+    STATUS_DRAIN_MS = 100
+
     def __init__(self):
         super().__init__()
         self.title("XML → Excel Extractor")
-        self.geometry("640x260")
+        self.geometry("640x340")
         self.resizable(False, False)
 
         self.xml_folder_var = tk.StringVar()
         self.output_name_var = tk.StringVar(value="combined_output.xlsx")
+        self.output_format_var = tk.StringVar(value="xlsx")
+        self.use_cache_var = tk.BooleanVar(value=False)
         self.status_var = tk.StringVar(value="Pick a folder of XML files, choose an output name, then Run.")
 
         pad = {"padx": 10, "pady": 6}
@@ -127,24 +330,42 @@ class App(tk.Tk):
         tk.Button(self, text="Browse…", command=self.browse_folder).grid(row=0, column=2, sticky="w", **pad)
 
         # Output name row
-        tk.Label(self, text="Output Excel name:").grid(row=1, column=0, sticky="w", **pad)
+        tk.Label(self, text="Output file name:").grid(row=1, column=0, sticky="w", **pad)
         tk.Entry(self, textvariable=self.output_name_var, width=60).grid(row=1, column=1, sticky="w", **pad)
-        tk.Label(self, text="(.xlsx)").grid(row=1, column=2, sticky="w", **pad)
+
+        # Output format row
+        tk.Label(self, text="Output format:").grid(row=2, column=0, sticky="w", **pad)
+        fmt_frame = tk.Frame(self)
+        fmt_frame.grid(row=2, column=1, columnspan=2, sticky="w", **pad)
+        for fmt in OUTPUT_FORMATS:
+            tk.Radiobutton(fmt_frame, text=f".{fmt}", variable=self.output_format_var, value=fmt).pack(side="left")
+        tk.Label(fmt_frame, text="(parquet/feather need pyarrow)").pack(side="left", padx=(8, 0))
+
+        # Cache row
+        tk.Checkbutton(
+            self, text="Cache parsed files for faster re-runs (stored in your user profile)",
+            variable=self.use_cache_var,
+        ).grid(row=3, column=1, columnspan=2, sticky="w", **pad)
 
         # Run button
         self.run_btn = tk.Button(self, text="Run", command=self.run_clicked, width=12)
-        self.run_btn.grid(row=2, column=1, sticky="w", **pad)
+        self.run_btn.grid(row=4, column=1, sticky="w", **pad)
 
         # Status box
-        tk.Label(self, text="Status:").grid(row=3, column=0, sticky="nw", **pad)
+        tk.Label(self, text="Status:").grid(row=5, column=0, sticky="nw", **pad)
         self.status_label = tk.Label(self, textvariable=self.status_var, justify="left", wraplength=520, anchor="w")
-        self.status_label.grid(row=3, column=1, columnspan=2, sticky="w", **pad)
+        self.status_label.grid(row=5, column=1, columnspan=2, sticky="w", **pad)
 
         # Little footer tip
         tk.Label(self, text="Tip: The output file will be saved inside the selected XML folder.").grid(
-            row=4, column=1, columnspan=2, sticky="w", padx=10, pady=2
+            row=6, column=1, columnspan=2, sticky="w", padx=10, pady=2
         )
 
+        # The worker thread only enqueues status lines; the Tk thread shows the latest
+        # one every STATUS_DRAIN_MS instead of repainting per file
+        self._status_queue = queue.Queue()
+        self.after(self.STATUS_DRAIN_MS, self._drain_status)
+
     def browse_folder(self):
         folder = filedialog.askdirectory(title="Select folder containing XML files")
         if folder:
@@ -154,29 +375,47 @@ class App(tk.Tk):
         self.status_var.set(msg)
         self.update_idletasks()
 
+    def _drain_status(self):
+        latest = None
+        try:
+            while True:
+                latest = self._status_queue.get_nowait()
+        except queue.Empty:
+            pass
+        if latest is not None:
+            self.status_var.set(latest)
+        self.after(self.STATUS_DRAIN_MS, self._drain_status)
+
     def run_clicked(self):
         xml_folder = self.xml_folder_var.get().strip()
         output_name = self.output_name_var.get().strip()
+        output_format = self.output_format_var.get()
+        use_cache = self.use_cache_var.get()
 
         if not xml_folder:
             messagebox.showerror("Missing folder", "Please select an XML folder.")
             return
         if not output_name:
-            messagebox.showerror("Missing output name", "Please enter an output Excel file name.")
+            messagebox.showerror("Missing output name", "Please enter an output file name.")
             return
 
         self.run_btn.config(state="disabled")
         self.set_status("Starting...")
 
+        # Never touch Tk from the worker: status goes through the queue, the rest through after()
         def worker():
             try:
-                out_path = extract_xml_folder_to_excel(xml_folder, output_name, status_cb=self.set_status)
-                messagebox.showinfo("Success", f"Export complete!\n\nSaved to:\n{out_path}")
+                out_path = extract_xml_folder_to_excel(
+                    xml_folder, output_name, status_cb=self._status_queue.put, output_format=output_format,
+                    use_cache=use_cache,
+                )
+                self.after(0, lambda: messagebox.showinfo("Success", f"Export complete!\n\nSaved to:\n{out_path}"))
             except Exception as e:
-                messagebox.showerror("Error", str(e))
-                self.set_status(f"Error: {e}")
+                err = str(e)
+                self._status_queue.put(f"Error: {err}")
+                self.after(0, lambda: messagebox.showerror("Error", err))
             finally:
-                self.run_btn.config(state="normal")
+                self.after(0, lambda: self.run_btn.config(state="normal"))
 
         threading.Thread(target=worker, daemon=True).start()
 
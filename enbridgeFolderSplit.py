@@ -1,9 +1,14 @@
+import datetime
+import numbers
 import os
+import queue
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+import numpy as np
 import pandas as pd
 
 
@@ -35,6 +40,20 @@ PATH_COL_CANDIDATES = [
 
 EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
 
+# Split file formats: xlsx for hand-editing; csv/parquet are far faster for big buckets
+# (parquet needs pyarrow)
+OUTPUT_FORMATS = ("xlsx", "csv", "parquet")
+EXCEL_MAX_ROWS = 1_048_576  # per sheet, header included
+
+READ_WORKERS = 8  # workbooks parsed in parallel
+WRITE_WORKERS = min(8, os.cpu_count() or 1)  # output files written in parallel
+
+# xlsxwriter is much faster (and leaner) than openpyxl for writing; openpyxl if missing
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 
 # -----------------------------
 # Helpers
@@ -65,12 +84,13 @@ def safe_filename(name: str) -> str:
 
 def build_category_regex(cat: str) -> re.Pattern:
     """
-    Match category in path even if underscores become spaces.
-    Example: AAA_GRM_VAULT matches AAA GRM VAULT or AAA_GRM_VAULT
+    Match the category name literally anywhere in the path, case-insensitive with
+    ASCII-only case folding. Underscores and spaces are not interchangeable:
+    AAA_GRM_VAULT matches aaa_grm_vault but not AAA GRM VAULT.
     """
-    esc = re.escape(cat)
-    esc = esc.replace(r"\_", r"[_\s]+")
-    return re.compile(esc, re.IGNORECASE)
+    # re.escape() has not escaped "_" since Python 3.7, so the category matches as written;
+    # the split outputs depend on that. ASCII keeps case folding from matching "ſ" as "s"
+    return re.compile(re.escape(cat), re.IGNORECASE | re.ASCII)
 
 
 CATEGORY_PATTERNS = {c: build_category_regex(c) for c in CATEGORIES}
@@ -89,43 +109,79 @@ def detect_path_column(columns) -> str | None:
     return None
 
 
-def pick_best_sheet(xls: pd.ExcelFile) -> str:
+def sheet_headers(file_path: str) -> dict:
+    """
+    {sheet name: header row} for every sheet, in workbook order; None if a sheet can't be read.
+    .xlsx/.xlsm: one read-only openpyxl pass over just the first row of each sheet.
+    .xls: one ExcelFile, header-only (nrows=0) reads.
+    """
+    if not file_path.lower().endswith(".xls"):
+        from openpyxl import load_workbook
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            headers = {}
+            for ws in wb.worksheets:
+                try:
+                    first = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+                    headers[ws.title] = [c for c in first if c is not None]
+                except Exception:
+                    headers[ws.title] = None
+            return headers
+        finally:
+            wb.close()
+
+    with pd.ExcelFile(file_path) as xls:
+        headers = {}
+        for s in xls.sheet_names:
+            try:
+                headers[s] = list(pd.read_excel(xls, sheet_name=s, nrows=0).columns)
+            except Exception:
+                headers[s] = None
+        return headers
+
+
+def pick_best_sheet(headers: dict) -> str:
     """
     Prefer 'Documents' if it has Original File Path column.
     Otherwise return first sheet that contains a path column.
     """
-    if "Documents" in xls.sheet_names:
-        try:
-            test = pd.read_excel(xls, sheet_name="Documents", nrows=5)
-            if detect_path_column(test.columns):
-                return "Documents"
-        except Exception:
-            pass
+    if headers.get("Documents") and detect_path_column(headers["Documents"]):
+        return "Documents"
 
-    for s in xls.sheet_names:
-        try:
-            test = pd.read_excel(xls, sheet_name=s, nrows=5)
-            if detect_path_column(test.columns):
-                return s
-        except Exception:
-            continue
+    for s, cols in headers.items():
+        if cols and detect_path_column(cols):
+            return s
+
+    return next(iter(headers))
 
-    return xls.sheet_names[0]
+
+def assign_categories(paths: pd.Series) -> np.ndarray:
+    """
+    Category per path, first match in CATEGORIES order wins; non-text -> OTHER.
+    One vectorized regex scan per category instead of a Python call per row.
+    """
+    paths = paths.astype(object)  # .str needs object/str dtype even when every cell is blank
+    conds = [paths.str.contains(CATEGORY_PATTERNS[cat], na=False) for cat in CATEGORIES]
+    return np.select(conds, CATEGORIES, default="OTHER")
 
 
-def assign_category(path_value: str) -> str:
-    if not isinstance(path_value, str):
-        return "OTHER"
-    for cat in CATEGORIES:
-        if CATEGORY_PATTERNS[cat].search(path_value):
-            return cat
-    return "OTHER"
+def categorize_paths(paths: pd.Series) -> pd.Categorical:
+    """
+    Category per row. Paths repeat, so each distinct path is classified once and
+    broadcast back by factorize code (-1 = blank -> OTHER).
+    """
+    all_cats = CATEGORIES + ["OTHER"]
+    path_codes, unique_paths = pd.factorize(paths)
+    unique_cat_codes = pd.Categorical(
+        assign_categories(pd.Series(unique_paths, dtype=object)), categories=all_cats
+    ).codes
+    cat_lookup = np.append(unique_cat_codes, all_cats.index("OTHER"))  # [-1] -> OTHER
+    return pd.Categorical.from_codes(cat_lookup[path_codes], all_cats)
 
 
 def read_one_excel(file_path: str) -> pd.DataFrame:
-    xls = pd.ExcelFile(file_path)
-    sheet = pick_best_sheet(xls)
-    df = pd.read_excel(xls, sheet_name=sheet)
+    sheet = pick_best_sheet(sheet_headers(file_path))
+    df = pd.read_excel(file_path, sheet_name=sheet)
 
     path_col = detect_path_column(df.columns)
     if not path_col:
@@ -141,56 +197,149 @@ def read_one_excel(file_path: str) -> pd.DataFrame:
     return df
 
 
-def merge_and_split_to_files(input_folder: str, output_folder: str, output_prefix: str, log_fn):
-    files = [
-        os.path.join(input_folder, f)
-        for f in os.listdir(input_folder)
-        if is_excel_file(f)
-    ]
-    if not files:
-        raise ValueError("No Excel files found in that folder.")
+def write_cell(ws, r, c, v):
+    # Split outputs keep the input cells' types; paths stay text even when they look like
+    # URLs (SharePoint links), which write() would turn into hyperlinks
+    # Returns xlsxwriter's status: negative means the cell was not written as given
+    if isinstance(v, bool):
+        return ws.write_boolean(r, c, v)
+    elif isinstance(v, numbers.Number):
+        return ws.write_number(r, c, v)
+    elif isinstance(v, (datetime.datetime, datetime.date)):
+        return ws.write_datetime(r, c, v)  # workbook default_date_format
+    else:
+        return ws.write_string(r, c, str(v))
 
-    log_fn(f"Found {len(files)} Excel files.")
 
-    all_dfs = []
-    for i, fp in enumerate(files, start=1):
-        log_fn(f"[{i}/{len(files)}] Reading: {os.path.basename(fp)}")
-        df = read_one_excel(fp)
-        all_dfs.append(df)
+def write_xlsx_constant_memory(part: pd.DataFrame, out_path: str, chunk_rows: int = 10_000):
+    """
+    One category's split file in xlsxwriter constant_memory mode, so a bucket of any
+    size is flushed to disk row by row. Rows are written strictly in order (header
+    first), blank cells skipped.
+    """
+    wb = xlsxwriter.Workbook(
+        out_path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"}
+    )
+    try:
+        ws = wb.add_worksheet()
+        for c, name in enumerate(part.columns):
+            write_cell(ws, 0, c, name)
+        r = 1
+        for start in range(0, len(part), chunk_rows):
+            # object dtype -> plain Python ints/floats/Timestamps that xlsxwriter understands
+            chunk = part.iloc[start:start + chunk_rows].astype(object)
+            for row in chunk.itertuples(index=False, name=None):
+                for c, v in enumerate(row):
+                    if v is None or v is pd.NaT or v is pd.NA or (isinstance(v, float) and v != v):
+                        continue
+                    # xlsxwriter reports errors by return value, not by raising
+                    if write_cell(ws, r, c, v) < 0:
+                        raise ValueError(f"Could not write row {r + 1}, column {part.columns[c]!r} of {out_path}")
+                r += 1
+    finally:
+        wb.close()
+
+
+def write_part_file(part: pd.DataFrame, out_path: str, output_format: str):
+    if output_format == "csv":
+        part.to_csv(out_path, index=False, encoding="utf-8-sig")
+    elif output_format == "parquet":
+        # object columns hold mixed cell types from Excel (e.g. text + numbers): store as text
+        mixed = part.select_dtypes("object").columns
+        part.astype({c: "string" for c in mixed}).to_parquet(out_path, index=False, compression="zstd")
+    elif len(part) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"{os.path.basename(out_path)} would have {len(part):,} rows, more than an Excel "
+            f"sheet holds ({EXCEL_MAX_ROWS - 1:,}). Choose csv or parquet output instead."
+        )
+    elif xlsxwriter is not None:
+        write_xlsx_constant_memory(part, out_path)
+    else:
+        part.to_excel(out_path, index=False, engine="openpyxl")
 
-    merged = pd.concat(all_dfs, ignore_index=True)
 
-    if "Original File Path" not in merged.columns:
-        raise ValueError("Merged data does not contain 'Original File Path' column (unexpected).")
+def merge_and_split_to_files(input_folder: str, output_folder: str, output_prefix: str, log_fn,
+                             output_format: str = "xlsx"):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
 
-    # Duplicate marker across ALL merged rows (based on filepath only)
-    merged["Filepath Dupe?"] = merged["Original File Path"].duplicated(keep=False).map(
-        {True: "YES", False: "NO"}
-    )
+    # DirEntry.is_file() uses the type cached by the directory scan (no extra stat)
+    with os.scandir(input_folder) as it:
+        files = [e.path for e in it if e.is_file() and is_excel_file(e.name)]
+    if not files:
+        raise ValueError("No Excel files found in that folder.")
 
-    # Category assignment (first match wins)
-    merged["Category"] = merged["Original File Path"].apply(assign_category)
+    log_fn(f"Found {len(files)} Excel files.")
+
+    # Workbooks are independent: parse several at once, results kept in file order.
+    # Each file is classified and bucketed by category as it arrives, so there is never a
+    # full merged copy; each file's frame is indexed by global row number so the
+    # cross-file dupe flag can be looked up per bucket at write time.
+    buckets = {}  # category -> [per-file slices, file order]
+    path_parts = []  # per-file "Original File Path", for the dupe flag
+    columns, seen_cols = [], set()  # column union in first-seen order (what concat would give)
+    n_rows = 0
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(files))) as ex:
+        for i, (fp, df) in enumerate(zip(files, ex.map(read_one_excel, files)), start=1):
+            log_fn(f"[{i}/{len(files)}] Read: {os.path.basename(fp)}")
+            df.index = pd.RangeIndex(n_rows, n_rows + len(df))
+            n_rows += len(df)
+
+            for c in df.columns:
+                if c not in seen_cols:
+                    seen_cols.add(c)
+                    columns.append(c)
+            path_parts.append(df["Original File Path"])
+
+            # Category assignment (first match wins)
+            df["Category"] = categorize_paths(df["Original File Path"])
+            for cat, sub in df.groupby("Category", observed=True, sort=False):
+                buckets.setdefault(cat, []).append(sub)
+
+    # Duplicate marker across ALL rows (based on filepath only), by global row number:
+    # count int codes instead of hashing every path string again (blanks share one code)
+    path_codes, _ = pd.factorize(pd.concat(path_parts), use_na_sentinel=False)
+    dup = np.bincount(path_codes)[path_codes] > 1
+    del path_parts
+    # a re-split previous output already has these: they are overwritten in place
+    columns += [c for c in ("Filepath Dupe?", "Category") if c not in seen_cols]
 
     # Output files: one per category (plus OTHER)
     prefix = safe_filename(output_prefix.replace(".xlsx", ""))
 
-    created = 0
+    writes = []
     for cat in CATEGORIES + ["OTHER"]:
-        part = merged[merged["Category"] == cat].copy()
-        if part.empty:
+        if cat not in buckets:
             log_fn(f"Skipping {cat} (no rows).")
             continue
 
-        out_name = f"{prefix}_{cat}.xlsx" if prefix else f"{cat}.xlsx"
+        out_name = f"{prefix}_{cat}.{output_format}" if prefix else f"{cat}.{output_format}"
         out_name = safe_filename(out_name)
         out_path = os.path.join(output_folder, out_name)
 
-        log_fn(f"Writing: {out_name} ({len(part):,} rows)")
-        # one sheet per file (nice + simple)
-        part.to_excel(out_path, index=False)
-
-        created += 1
+        log_fn(f"Writing: {out_name} ({sum(len(s) for s in buckets[cat]):,} rows)")
+        writes.append((out_path, cat))
 
+    def write_part(job):
+        out_path, cat = job
+        # one sheet per file (nice + simple); a bucket is concatenated only when it is
+        # written and its slices released, so only WRITE_WORKERS parts are whole at once
+        part = pd.concat(buckets.pop(cat))
+        part["Filepath Dupe?"] = pd.Categorical.from_codes(
+            dup[part.index].astype(np.int8), ["NO", "YES"]
+        )
+        part = part.reindex(columns=columns).reset_index(drop=True)
+        # a handful of distinct values per column: 1-byte codes instead of a str per row
+        part["Source File"] = part["Source File"].astype("category")
+        part["Source Sheet"] = part["Source Sheet"].astype("category")
+        write_part_file(part, out_path, output_format)
+
+    # Output files are independent: write them concurrently
+    if writes:
+        with ThreadPoolExecutor(max_workers=min(WRITE_WORKERS, len(writes))) as ex:
+            list(ex.map(write_part, writes))
+
+    created = len(writes)
     if created == 0:
         raise ValueError("No output files were created (no category matches found).")
 
@@ -201,6 +350,9 @@ def merge_and_split_to_files(input_folder: str, output_folder: str, output_prefi
 # GUI
 # -----------------------------
 class App(tk.Tk):
+    LOG_DRAIN_MS = 100
+    LOG_DRAIN_MAX = 500  # lines inserted per drain tick
+
     def __init__(self):
         super().__init__()
         self.title("Excel Merger → Split to Separate Files")
@@ -211,9 +363,15 @@ class App(tk.Tk):
         self.output_folder = tk.StringVar()
         # This is now a PREFIX (not a single output filename)
         self.output_prefix = tk.StringVar(value="ENB_SPLIT")
+        self.output_format = tk.StringVar(value="xlsx")
 
         self._build_ui()
 
+        # Worker threads never touch Tk: log lines are queued and flushed in batches
+        # every LOG_DRAIN_MS instead of repainting per line
+        self._log_q = queue.Queue()
+        self.after(self.LOG_DRAIN_MS, self._drain_log)
+
     def _build_ui(self):
         pad = {"padx": 10, "pady": 6}
 
@@ -254,6 +412,11 @@ class App(tk.Tk):
             row=2, column=1, sticky="w", padx=6, pady=(4, 0)
         )
 
+        ttk.Label(out_grid, text="Output format:").grid(row=3, column=0, sticky="w", pady=(8, 0))
+        ttk.Combobox(
+            out_grid, textvariable=self.output_format, values=OUTPUT_FORMATS, state="readonly", width=10
+        ).grid(row=3, column=1, sticky="w", padx=6, pady=(8, 0))
+
         out_grid.columnconfigure(1, weight=1)
 
         # Run button + progress
@@ -294,14 +457,29 @@ class App(tk.Tk):
             self.output_folder.set(folder)
 
     def log_line(self, msg: str):
-        self.log.insert("end", msg + "\n")
-        self.log.see("end")
-        self.update_idletasks()
+        self._log_q.put(msg)
+
+    def _drain_log(self):
+        batch = []
+        try:
+            while len(batch) < self.LOG_DRAIN_MAX:
+                batch.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self.log.insert("end", "\n".join(batch) + "\n")
+            self.log.see("end")
+        self.after(self.LOG_DRAIN_MS, self._drain_log)
+
+    def _run_finished(self):
+        self.prog.stop()
+        self.run_btn.config(state="normal")
 
     def on_run(self):
         in_dir = self.input_folder.get().strip()
         out_dir = self.output_folder.get().strip()
         prefix = self.output_prefix.get().strip()
+        output_format = self.output_format.get()
 
         if not in_dir or not os.path.isdir(in_dir):
             messagebox.showerror("Missing input", "Please choose a valid input folder.")
@@ -321,14 +499,14 @@ class App(tk.Tk):
 
         def worker():
             try:
-                merge_and_split_to_files(in_dir, out_dir, prefix, self.log_line)
-                messagebox.showinfo("Done", f"Saved outputs in:\n{out_dir}")
+                merge_and_split_to_files(in_dir, out_dir, prefix, self.log_line, output_format)
+                self.after(0, lambda: messagebox.showinfo("Done", f"Saved outputs in:\n{out_dir}"))
             except Exception as e:
-                self.log_line(f"ERROR: {e}")
-                messagebox.showerror("Error", str(e))
+                err = str(e)
+                self.log_line(f"ERROR: {err}")
+                self.after(0, lambda: messagebox.showerror("Error", err))
             finally:
-                self.prog.stop()
-                self.run_btn.config(state="normal")
+                self.after(0, self._run_finished)
 
         threading.Thread(target=worker, daemon=True).start()
 
@@ -1,24 +1,88 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import numpy as np
 import pandas as pd
+import datetime
+import numbers
 import os
+import queue
+import threading
+
+# python-calamine (Rust reader) if installed: much faster than openpyxl on big sheets.
+# Text-only columns load as pandas "str" dtype, which is Arrow-backed when pyarrow is
+# installed; dtype_backend="pyarrow" is not used because it rejects mixed text/number
+# columns (e.g. Revision "A" / 0), which manifests are full of.
+try:
+    from python_calamine import CalamineWorkbook
+    READ_ENGINE = "calamine"
+except ImportError:
+    READ_ENGINE = None
+
+# xlsxwriter (constant_memory) streams the export to disk row by row; openpyxl otherwise
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_MAX_ROWS = 1_048_576  # per sheet, header included
 
 # ----------------------------
 # Helpers
 # ----------------------------
 def safe_upper_series(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.StringDtype):  # already text: no cast, upper runs on the buffer
+        return s.str.upper()
     return s.astype(str).str.upper()
 
 def is_blank_series(s: pd.Series) -> pd.Series:
+    if s.dtype.kind in "biufcmM":  # numbers / dates / bools: only missing counts as blank
+        return s.isnull()
+    if isinstance(s.dtype, pd.CategoricalDtype):  # strip each distinct value once
+        cats = s.cat.categories
+        return s.isnull() | s.isin(cats[is_blank_series(pd.Series(cats)).to_numpy()])
+    if isinstance(s.dtype, pd.StringDtype):  # already text: no str() cast
+        return s.isnull() | (s.str.strip() == "")
     return s.isnull() | (s.astype(str).str.strip() == "")
 
+def write_cell(ws, r, c, v):
+    # typed write per value: manifests mix numbers and text in one column, and File Path
+    # values that look like URLs must stay text (write() would turn them into links).
+    # Returns xlsxwriter's status: negative means the cell was not written as given
+    if isinstance(v, bool):
+        return ws.write_boolean(r, c, v)
+    elif isinstance(v, numbers.Number):
+        return ws.write_number(r, c, v)
+    elif isinstance(v, (datetime.datetime, datetime.date)):
+        return ws.write_datetime(r, c, v)  # workbook default_date_format
+    else:
+        return ws.write_string(r, c, str(v))
+
+def write_sheet_rows(ws, df: pd.DataFrame, chunk_rows: int = 10_000):
+    """
+    One export sheet, top to bottom: the export workbook is constant_memory, which
+    only accepts rows in order. Missing values are left as empty cells.
+    """
+    for c, name in enumerate(df.columns):
+        write_cell(ws, 0, c, name)
+    r = 1
+    for start in range(0, len(df), chunk_rows):
+        # object dtype -> plain Python values (category codes, numpy scalars resolved)
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        for row in chunk.itertuples(index=False, name=None):
+            for c, v in enumerate(row):
+                if v is None or v is pd.NaT or v is pd.NA or (isinstance(v, float) and v != v):
+                    continue
+                if write_cell(ws, r, c, v) < 0:  # xlsxwriter doesn't raise for these
+                    raise ValueError(f"Could not write row {r + 1}, column {df.columns[c]!r}.")
+            r += 1
+
 def basename_from_path(p: pd.Series) -> pd.Series:
-    # Handles NaN safely
-    return p.fillna("").astype(str).apply(lambda x: os.path.basename(x))
+    # Handles NaN safely; drop everything up to the last \ or / (Windows basename)
+    return p.fillna("").astype(str).str.replace(r"(?s)^.*[\\/]", "", regex=True)
 
 def stem_from_filename(fn: pd.Series) -> pd.Series:
-    # Remove extension
-    return fn.fillna("").astype(str).apply(lambda x: os.path.splitext(x)[0])
+    # Remove extension: from the last dot, unless only dots precede it (".bashrc"), like splitext
+    return fn.fillna("").astype(str).str.replace(r"(?s)^(\.*[^.].*)\.[^.]*$", r"\1", regex=True)
 
 
 # ----------------------------
@@ -35,21 +99,45 @@ def analyze_document_data(
     dupe_cols: list[str],
     derive_filename_from_path: bool,
     derive_stem_from_filename: bool,
+    cache: dict | None = None,
 ):
+    """
+    cache: optional dict kept by the caller for as long as df is unchanged. Derived /
+    recast columns and per-column factorize codes are memoized in it, so re-runs with
+    other duplicate rules skip straight to combining codes.
+    """
     lines = []
 
-    # Work on a copy so we can add derived cols without messing original view
-    df2 = df.copy()
+    def memo(key, build):
+        if cache is None:
+            return build()
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    # Work on a copy so we can add derived / recast cols without messing original view.
+    # Shallow is enough: with copy-on-write, new or replaced columns never reach df and
+    # untouched columns share its memory instead of duplicating the whole sheet
+    df2 = df.copy(deep=False)
 
     # Derived fields (optional)
     derived_cols = []
     if col_path and derive_filename_from_path:
-        df2["__FileName"] = basename_from_path(df2[col_path])
+        df2["__FileName"] = memo(("__FileName", col_path), lambda: basename_from_path(df2[col_path]))
         derived_cols.append("__FileName")
         if derive_stem_from_filename:
-            df2["__FileStem"] = stem_from_filename(df2["__FileName"])
+            df2["__FileStem"] = memo(("__FileStem", col_path), lambda: stem_from_filename(df2["__FileName"]))
             derived_cols.append("__FileStem")
 
+    def cache_key(c):  # derived columns depend on which column is mapped as the path
+        return (c, col_path) if c in derived_cols else c
+
+    # Low-cardinality text columns as category: dedup / counts / sorts then hash and
+    # compare int codes instead of Python strings
+    for c in (col_type, col_number, col_rev, *derived_cols):
+        if c and c in df2.columns and pd.api.types.is_string_dtype(df2[c].dtype):  # object / str
+            df2[c] = memo(("category", cache_key(c)), lambda: df2[c].astype("category"))
+
     # 1. Total count
     lines.append(f"1. Total File Count (Rows): {len(df2)}")
 
@@ -79,30 +167,34 @@ def analyze_document_data(
     if not dupe_cols:
         raise ValueError("No duplicate columns selected.")
 
-    duplicates_mask = df2.duplicated(subset=dupe_cols, keep="first")
+    # hash each key column once (memoized across runs): blanks get their own code, then
+    # one group id per distinct combination of codes; both masks come from the int ids
+    codes = {
+        i: memo(("codes", cache_key(c)), lambda: pd.factorize(df2[c], use_na_sentinel=False)[0])
+        for i, c in enumerate(dupe_cols)
+    }
+    dupe_key = pd.DataFrame(codes).groupby(list(codes), sort=False).ngroup().to_numpy()
+    duplicates_mask = pd.Series(dupe_key, index=df2.index).duplicated(keep="first")
     duplicates = df2[duplicates_mask]
     lines.append(f"\n5. Total Duplicates (based on {', '.join(dupe_cols)}): {len(duplicates)}")
 
     all_dupe_rows = pd.DataFrame()
     if len(duplicates) > 0:
-        all_dupe_rows = df2[df2.duplicated(subset=dupe_cols, keep=False)].sort_values(by=dupe_cols)
+        all_dupe_rows = df2[np.bincount(dupe_key)[dupe_key] > 1].sort_values(by=dupe_cols)
         lines.append("   Sample records of Duplicates (first 10 of the full set):")
-        show_cols = dupe_cols.copy()
-        # add path/name columns for context if not already included
-        for extra in [col_path, col_name, col_number, col_rev]:
-            if extra and extra not in show_cols:
-                show_cols.append(extra)
-        # add derived cols if they exist and not already there
-        for dc in derived_cols:
-            if dc in df2.columns and dc not in show_cols:
-                show_cols.append(dc)
+        # dupe cols, then path/name columns for context and derived cols (first occurrence wins)
+        show_cols = list(dict.fromkeys(
+            [*dupe_cols, *(c for c in (col_path, col_name, col_number, col_rev) if c), *derived_cols]
+        ))
         lines.append(all_dupe_rows[show_cols].head(10).to_string(index=False))
 
     # 6. Revision stacks by Document Number (if provided)
     revision_stacks = pd.Series(dtype=int)
     if col_number:
-        stack_counts = df2[col_number].value_counts(dropna=False)
-        revision_stacks = stack_counts[stack_counts > 1]
+        # counts in first-seen order (no sort of the whole histogram); only the stacks
+        # get sorted, largest first, equal counts keeping first-seen order
+        stack_counts = df2.groupby(col_number, sort=False, dropna=False, observed=True).size().rename("count")
+        revision_stacks = stack_counts[stack_counts > 1].sort_values(ascending=False, kind="stable")
 
         lines.append("\n6. Document Revision Stacks Found:")
         lines.append(f"   Total unique Document Numbers: {len(stack_counts)}")
@@ -124,6 +216,8 @@ def analyze_document_data(
 # GUI
 # ----------------------------
 class App(tk.Tk):
+    QUEUE_POLL_MS = 50
+
     def __init__(self):
         super().__init__()
         self.title("Document Data Analyzer (GUI)")
@@ -135,6 +229,7 @@ class App(tk.Tk):
 
         self.df = None
         self.columns = []
+        self._analysis_cache = {}  # memoized columns / codes for self.df (see analyze_document_data)
 
         # column mapping
         self.col_name = tk.StringVar()
@@ -167,6 +262,11 @@ class App(tk.Tk):
 
         self._build_ui()
 
+        # Sheet loads and analyses run on a worker thread; it hands UI updates back as
+        # callables on this queue, which the Tk thread drains every QUEUE_POLL_MS
+        self._ui_queue = queue.Queue()
+        self.after(self.QUEUE_POLL_MS, self._drain_queue)
+
     def _build_ui(self):
         # File picker row
         top = ttk.Frame(self, padding=10)
@@ -185,9 +285,12 @@ class App(tk.Tk):
         self.sheet_combo = ttk.Combobox(mid, textvariable=self.sheet_name, state="readonly", width=40, values=[])
         self.sheet_combo.grid(row=0, column=1, padx=8, sticky="w")
 
-        ttk.Button(mid, text="Load Sheet", command=self.load_sheet).grid(row=0, column=2, padx=8)
-        ttk.Button(mid, text="Run Analysis", command=self.run_analysis).grid(row=0, column=3, padx=8)
-        ttk.Button(mid, text="Export Results…", command=self.export_results).grid(row=0, column=4, padx=8)
+        self.load_btn = ttk.Button(mid, text="Load Sheet", command=self.load_sheet)
+        self.load_btn.grid(row=0, column=2, padx=8)
+        self.run_btn = ttk.Button(mid, text="Run Analysis", command=self.run_analysis)
+        self.run_btn.grid(row=0, column=3, padx=8)
+        self.export_btn = ttk.Button(mid, text="Export Results…", command=self.export_results)
+        self.export_btn.grid(row=0, column=4, padx=8)
 
         # Mapping frame
         mapf = ttk.LabelFrame(self, text="Column Mapping", padding=10)
@@ -302,6 +405,43 @@ class App(tk.Tk):
             self.use_derived_stem.set(False)
             self.derive_stem_from_filename.set(False)
 
+    # ----------------------------
+    # Background work
+    # ----------------------------
+    def _drain_queue(self):
+        try:
+            while True:
+                self._ui_queue.get_nowait()()
+        except queue.Empty:
+            pass
+        finally:
+            # keep polling even if a callback raised, or later updates would never show
+            self.after(self.QUEUE_POLL_MS, self._drain_queue)
+
+    def _run_in_background(self, busy_msg, work, on_done, on_error):
+        """
+        Run work() off the Tk thread with the action buttons disabled; on_done(result) /
+        on_error(exc) then run back on the Tk thread.
+        """
+        for btn in (self.load_btn, self.run_btn, self.export_btn):
+            btn.config(state="disabled")
+        self.status.set(busy_msg)
+
+        def finish(callback, arg):
+            for btn in (self.load_btn, self.run_btn, self.export_btn):
+                btn.config(state="normal")
+            callback(arg)
+
+        def worker():
+            try:
+                result = work()
+            except Exception as e:
+                self._ui_queue.put(lambda e=e: finish(on_error, e))
+            else:
+                self._ui_queue.put(lambda: finish(on_done, result))
+
+        threading.Thread(target=worker, daemon=True).start()
+
     # ----------------------------
     # Presets
     # ----------------------------
@@ -355,8 +495,13 @@ class App(tk.Tk):
 
     def populate_sheets(self, path):
         try:
-            xl = pd.ExcelFile(path)
-            sheets = xl.sheet_names
+            # sheet list only: calamine reads the workbook index without building a reader
+            if READ_ENGINE == "calamine":
+                with CalamineWorkbook.from_path(path) as wb:
+                    sheets = wb.sheet_names
+            else:
+                with pd.ExcelFile(path) as xl:
+                    sheets = xl.sheet_names
             self.sheet_combo["values"] = sheets
             if sheets:
                 self.sheet_name.set(sheets[0])
@@ -375,8 +520,9 @@ class App(tk.Tk):
             messagebox.showwarning("Missing sheet", "Choose a sheet first.")
             return
 
-        try:
-            self.df = pd.read_excel(path, sheet_name=sheet)
+        def loaded(df):
+            self.df = df
+            self._analysis_cache = {}
             self.columns = list(self.df.columns)
 
             for combo in (self.name_combo, self.num_combo, self.rev_combo, self.size_combo, self.type_combo, self.path_combo):
@@ -386,10 +532,18 @@ class App(tk.Tk):
             self.status.set(f"Loaded {len(self.df)} rows from '{sheet}'. Now run analysis.")
             self.text.delete("1.0", "end")
             self.text.insert("end", f"Loaded sheet '{sheet}'. Columns detected:\n- " + "\n- ".join(map(str, self.columns)) + "\n")
-        except Exception as e:
+
+        def failed(e):
             messagebox.showerror("Error", f"Could not load sheet.\n\n{e}")
             self.status.set("Failed to load sheet.")
 
+        self._run_in_background(
+            f"Loading '{sheet}'…",
+            lambda: pd.read_excel(path, sheet_name=sheet, engine=READ_ENGINE),
+            loaded,
+            failed,
+        )
+
     def _auto_map_columns(self):
         def pick(preferred, fallbacks):
             cols_lower = {str(c).lower(): c for c in self.columns}
@@ -469,14 +623,7 @@ class App(tk.Tk):
                 dupe_cols.append("__FileStem")
 
         # unique + preserve order
-        seen = set()
-        ordered = []
-        for c in dupe_cols:
-            if c not in seen:
-                ordered.append(c)
-                seen.add(c)
-
-        return ordered
+        return list(dict.fromkeys(dupe_cols))
 
     def run_analysis(self):
         if self.df is None:
@@ -512,14 +659,28 @@ class App(tk.Tk):
             messagebox.showerror("Invalid mapping", f"Revision column not found in sheet: {rev}")
             return
 
+        def failed(e):
+            messagebox.showerror("Error", f"Analysis failed.\n\n{e}")
+            self.status.set("Analysis failed.")
+
         try:
             dupe_cols = self._build_dupe_cols()
-            if not dupe_cols:
-                messagebox.showwarning("Duplicate rules", "Tick at least one field for duplicate detection.")
-                return
+        except Exception as e:
+            failed(e)
+            return
+        if not dupe_cols:
+            messagebox.showwarning("Duplicate rules", "Tick at least one field for duplicate detection.")
+            return
+
+        # Tk variables are read here, on the Tk thread; the worker only sees plain values
+        df = self.df
+        derive_filename = self.derive_filename_from_path.get()
+        derive_stem = self.derive_stem_from_filename.get()
+        cache = self._analysis_cache
 
-            text, no_size, no_type, dupes, all_dupes, stacks = analyze_document_data(
-                self.df,
+        def work():
+            return analyze_document_data(
+                df,
                 col_name=name,
                 col_number=num,
                 col_size=size,
@@ -527,10 +688,14 @@ class App(tk.Tk):
                 col_path=path,
                 col_rev=rev,
                 dupe_cols=dupe_cols,
-                derive_filename_from_path=self.derive_filename_from_path.get(),
-                derive_stem_from_filename=self.derive_stem_from_filename.get(),
+                derive_filename_from_path=derive_filename,
+                derive_stem_from_filename=derive_stem,
+                cache=cache,
             )
 
+        def done(result):
+            text, no_size, no_type, dupes, all_dupes, stacks = result
+
             self.out_no_size = no_size
             self.out_no_type = no_type
             self.out_duplicates = dupes
@@ -540,9 +705,8 @@ class App(tk.Tk):
             self.text.delete("1.0", "end")
             self.text.insert("end", text)
             self.status.set("Analysis complete.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Analysis failed.\n\n{e}")
-            self.status.set("Analysis failed.")
+
+        self._run_in_background("Running analysis…", work, done, failed)
 
     # ----------------------------
     # Export
@@ -565,20 +729,39 @@ class App(tk.Tk):
         if not save_path:
             return
 
+        sheets = []
+        if self.out_no_size is not None:
+            sheets.append(("No File Size", self.out_no_size))
+        if self.out_no_type is not None:
+            sheets.append(("No File Type", self.out_no_type))
+        if self.out_duplicates is not None:
+            sheets.append(("Duplicates (Copies)", self.out_duplicates))
+        if self.out_all_dupes is not None and not self.out_all_dupes.empty:
+            sheets.append(("Duplicates (Full Set)", self.out_all_dupes))
+        if self.out_revision_stacks is not None and not self.out_revision_stacks.empty:
+            sheets.append(("Revision Stacks", self.out_revision_stacks.rename("Count").reset_index()))
+
         try:
-            with pd.ExcelWriter(save_path, engine="openpyxl") as writer:
-                if self.out_no_size is not None:
-                    self.out_no_size.to_excel(writer, index=False, sheet_name="No File Size")
-                if self.out_no_type is not None:
-                    self.out_no_type.to_excel(writer, index=False, sheet_name="No File Type")
-                if self.out_duplicates is not None:
-                    self.out_duplicates.to_excel(writer, index=False, sheet_name="Duplicates (Copies)")
-                if self.out_all_dupes is not None and not self.out_all_dupes.empty:
-                    self.out_all_dupes.to_excel(writer, index=False, sheet_name="Duplicates (Full Set)")
-                if self.out_revision_stacks is not None and not self.out_revision_stacks.empty:
-                    self.out_revision_stacks.rename("Count").to_frame().to_excel(
-                        writer, sheet_name="Revision Stacks"
+            # checked up front for both engines: xlsxwriter would drop the extra rows silently
+            for sheet_name, frame in sheets:
+                if len(frame) + 1 > EXCEL_MAX_ROWS:
+                    raise ValueError(
+                        f"'{sheet_name}' has {len(frame):,} rows, more than an Excel sheet holds "
+                        f"({EXCEL_MAX_ROWS - 1:,})."
                     )
+            if xlsxwriter is not None:
+                wb = xlsxwriter.Workbook(
+                    save_path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"}
+                )
+                try:
+                    for sheet_name, frame in sheets:
+                        write_sheet_rows(wb.add_worksheet(sheet_name), frame)
+                finally:
+                    wb.close()
+            else:
+                with pd.ExcelWriter(save_path, engine="openpyxl") as writer:
+                    for sheet_name, frame in sheets:
+                        frame.to_excel(writer, index=False, sheet_name=sheet_name)
 
             messagebox.showinfo("Saved", f"Exported results to:\n{save_path}")
             self.status.set("Export complete.")